@@ -9,41 +9,194 @@ import json
 import os
 from datetime import datetime, timedelta
 import subprocess
+from itertools import chain
+from collections import defaultdict, deque
 from pathlib import Path
 import logging
-from typing import List, Dict, Tuple, Optional
+import queue
+import threading
+from typing import List, Dict, Tuple, Optional, NamedTuple
 import torch
 from ultralytics import YOLO
-import mediapipe as mp
 from scipy.signal import find_peaks
-from sklearn.cluster import DBSCAN
+from scipy.spatial import cKDTree
+
+try:
+    import decord
+except ImportError:
+    decord = None
+
+try:
+    import av
+except ImportError:
+    av = None
+
+try:
+    from av.codec.hwaccel import HWAccel
+except ImportError:
+    HWAccel = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    from supabase_client import get_supabase_client
+except ImportError:
+    get_supabase_client = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Action labels indexed by the codes returned from _classify_actions
+ACTION_TYPES = ("running", "turning", "jumping", "standing", "walking")
+
+
+class FrameRecord(NamedTuple):
+    """Analysis result for one sampled frame"""
+
+    timestamp: float
+    detections: List[Dict]
+    pose_data: List[Dict]
+    activity_score: float
+    events: List[Dict]
+    player_count: int
+    ball_detected: bool
+
+
+def _classify_actions(body_lean, leg_spread, knee_bend, out):
+    """Rule-based action codes for all players (see ACTION_TYPES)"""
+    for i in range(len(out)):
+        if knee_bend[i] > 0.3 and leg_spread[i] > 0.2:
+            out[i] = 0  # running
+        elif body_lean[i] > 0.2:
+            out[i] = 1  # turning
+        elif knee_bend[i] > 0.4:
+            out[i] = 2  # jumping
+        elif leg_spread[i] < 0.1 and knee_bend[i] < 0.1:
+            out[i] = 3  # standing
+        else:
+            out[i] = 4  # walking
+
+
+if numba is not None:
+    _classify_actions = numba.njit(cache=True)(_classify_actions)
+
+
+def grid_dbscan(points: np.ndarray, eps: float, min_samples: int) -> np.ndarray:
+    """
+    DBSCAN over 2D points using a uniform grid of ``eps``-sized cells
+
+    Neighbour queries only look at the 3x3 block of cells around a point,
+    so the cost is close to linear for spread-out detections instead of
+    comparing every pair of points.
+
+    Args:
+        points: (N, 2) array of positions
+        eps: Neighbourhood radius
+        min_samples: Neighbours (including the point itself) for a core point
+
+    Returns:
+        (N,) array of cluster labels, -1 for noise
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n_points = len(points)
+    labels = np.full(n_points, -1, dtype=np.int64)
+    if n_points == 0:
+        return labels
+
+    cells = np.floor(points / eps).astype(np.int64)
+    grid = defaultdict(list)
+    for idx, (cx, cy) in enumerate(cells.tolist()):
+        grid[(cx, cy)].append(idx)
+
+    eps_sq = eps * eps
+    neighbours = []
+    for idx, (cx, cy) in enumerate(cells.tolist()):
+        candidates = [
+            j
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            for j in grid.get((cx + dx, cy + dy), ())
+        ]
+        candidates = np.array(candidates)
+        dist_sq = ((points[candidates] - points[idx]) ** 2).sum(axis=1)
+        neighbours.append(candidates[dist_sq <= eps_sq])
+
+    is_core = np.array([len(n) >= min_samples for n in neighbours])
+
+    cluster_id = 0
+    for idx in range(n_points):
+        if labels[idx] != -1 or not is_core[idx]:
+            continue
+
+        labels[idx] = cluster_id
+        queue_ = deque([idx])
+        while queue_:
+            current = queue_.popleft()
+            if not is_core[current]:
+                continue
+            for neighbour in neighbours[current]:
+                if labels[neighbour] == -1:
+                    labels[neighbour] = cluster_id
+                    queue_.append(neighbour)
+
+        cluster_id += 1
+
+    return labels
+
 
 class FootballHighlightProcessor:
     """
     Main class for processing football videos and generating highlights
     """
 
-    def __init__(self, model_path: str = "yolo11n.pt"):
+    def __init__(
+        self,
+        model_path: str = "yolo11n.pt",
+        pose_model_path: str = "yolo11n-pose.pt",
+        batch_size: int = 16,
+        use_tensorrt: bool = True,
+        int8_calibration_data: Optional[str] = None,
+    ):
         """
         Initialize the highlight processor
 
         Args:
             model_path: Path to YOLO model file
+            pose_model_path: Path to YOLO pose model file
+            batch_size: Number of sampled frames sent to YOLO per inference call
+            use_tensorrt: Export/load a TensorRT engine when CUDA is available
+            int8_calibration_data: Dataset yaml for INT8 calibration (FP16 if None)
         """
-        self.model = YOLO(model_path)
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=1,
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
+        self.batch_size = max(1, batch_size)
+
+        # FP16 inference on CUDA; CPU stays in FP32
+        self.use_half = torch.cuda.is_available()
+
+        # Pinned staging buffer for asynchronous host-to-device frame copies
+        self.imgsz = 640
+        self.pinned_frames = None
+        self.copy_stream = None
+        if torch.cuda.is_available():
+            self.pinned_frames = torch.empty(
+                (self.batch_size, self.imgsz, self.imgsz, 3),
+                dtype=torch.uint8,
+                pin_memory=True,
+            )
+            self.copy_stream = torch.cuda.Stream()
+        self.model = self.load_model(model_path, use_tensorrt, int8_calibration_data)
+        self.pose_model = self.load_model(
+            pose_model_path, use_tensorrt, int8_calibration_data, task="pose"
         )
 
+        # Integer class ids so per-detection checks avoid string comparisons
+        class_ids = {name: cls for cls, name in self.model.names.items()}
+        self.person_id = class_ids.get("person", 0)
+        self.ball_id = class_ids.get("sports ball", 32)
+
         # Event detection thresholds
         self.config = {
             "min_highlight_duration": 10,  # seconds
@@ -53,6 +206,12 @@ class FootballHighlightProcessor:
             "celebration_threshold": 0.6,
             "fast_movement_threshold": 50,  # pixels per frame
             "ball_near_goal_threshold": 100,  # pixels
+            "ball_contest_radius": 150,  # pixels
+            "ball_contest_min_players": 3,
+            "celebration_radius": 150,  # pixels between grouped celebrating players
+            "motion_threshold": 4.0,  # mean abs gray diff (0-255) to run YOLO
+            "max_inference_gap": 1.0,  # seconds; always run YOLO at least this often
+            "clip_stream_copy": True,  # cut clips without re-encoding (keyframe snap)
         }
 
         # Field detection
@@ -61,8 +220,97 @@ class FootballHighlightProcessor:
         # Action classifiers
         self.action_classifier = ActionClassifier()
 
+    def load_model(
+        self,
+        model_path: str,
+        use_tensorrt: bool = True,
+        int8_calibration_data: Optional[str] = None,
+        task: str = "detect",
+    ) -> YOLO:
+        """
+        Load the YOLO model, using a TensorRT engine on CUDA machines
+
+        The engine is exported once next to the ``.pt`` file and reused on
+        later runs. CPU-only machines keep the PyTorch weights.
+
+        Args:
+            model_path: Path to YOLO model file
+            use_tensorrt: Export/load a TensorRT engine when CUDA is available
+            int8_calibration_data: Dataset yaml for INT8 calibration (FP16 if None)
+            task: YOLO task of the model ("detect" or "pose")
+
+        Returns:
+            Loaded YOLO model
+        """
+        if not model_path.endswith(".pt"):
+            return YOLO(model_path, task=task)
+
+        if use_tensorrt and torch.cuda.is_available():
+            torch.backends.cudnn.benchmark = True
+
+            engine_path = Path(model_path).with_suffix(".engine")
+            if not engine_path.exists():
+                logger.info(f"Exporting {model_path} to TensorRT engine...")
+                export_args = {
+                    "format": "engine",
+                    "dynamic": True,
+                    "batch": self.batch_size,
+                    "imgsz": 640,
+                }
+                if int8_calibration_data:
+                    export_args.update(int8=True, data=int8_calibration_data)
+                else:
+                    export_args["half"] = True
+
+                try:
+                    engine_path = Path(YOLO(model_path).export(**export_args))
+                except Exception as e:
+                    logger.warning(f"TensorRT export failed, using PyTorch model: {e}")
+                    engine_path = None
+
+            if engine_path is not None:
+                logger.info(f"Loading TensorRT engine: {engine_path}")
+                return YOLO(str(engine_path), task=task)
+
+        return self.optimize_pytorch_model(YOLO(model_path))
+
+    def optimize_pytorch_model(self, model: YOLO) -> YOLO:
+        """
+        Fuse Conv+BN layers and compile the network for eager PyTorch inference
+
+        Compilation is only attempted on CUDA, where ``reduce-overhead`` mode
+        can use CUDA graphs. Two warm-up calls keep the compile cost off the
+        first real frame.
+
+        Args:
+            model: Loaded YOLO model
+
+        Returns:
+            The same YOLO model, optimized in place
+        """
+        model.fuse()
+
+        if torch.cuda.is_available() and hasattr(torch, "compile"):
+            eager_model = model.model
+            try:
+                model.model = torch.compile(
+                    eager_model, mode="reduce-overhead", fullgraph=False
+                )
+                dummy = np.zeros((640, 640, 3), dtype=np.uint8)
+                for _ in range(2):
+                    model(dummy, verbose=False)
+            except Exception as e:
+                logger.warning(f"torch.compile failed, using eager model: {e}")
+                model.model = eager_model
+                model.predictor = None
+
+        return model
+
     def process_video(
-        self, video_path: str, output_dir: str = "highlights"
+        self,
+        video_path: str,
+        output_dir: str = "highlights",
+        session_id: Optional[str] = None,
     ) -> List[Dict]:
         """
         Process a football video and generate highlights
@@ -70,6 +318,8 @@ class FootballHighlightProcessor:
         Args:
             video_path: Path to input video
             output_dir: Directory to save highlights
+            session_id: Game session to store the highlights under in
+                Supabase (not stored if None)
 
         Returns:
             List of highlight information dictionaries
@@ -86,15 +336,19 @@ class FootballHighlightProcessor:
         highlight_moments = self.detect_highlights(analysis_data)
 
         # Generate highlight clips
-        highlights = []
-        for i, moment in enumerate(highlight_moments):
-            highlight_info = self.create_highlight_clip(
-                video_path, moment, output_dir, i
-            )
-            if highlight_info:
-                highlights.append(highlight_info)
+        highlights = self.create_highlight_clips(
+            video_path, highlight_moments, output_dir
+        )
 
         logger.info(f"Generated {len(highlights)} highlights")
+
+        # Store the whole session's highlights with one multi-row insert
+        if session_id is not None:
+            if get_supabase_client is None:
+                logger.warning("supabase is not installed, highlights not saved")
+            else:
+                get_supabase_client().save_highlights(session_id, highlights)
+
         return highlights
 
     def analyze_video(self, video_path: str) -> Dict:
@@ -110,6 +364,7 @@ class FootballHighlightProcessor:
         cap = cv2.VideoCapture(video_path)
         fps = cap.get(cv2.CAP_PROP_FPS)
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
 
         analysis_data = {
             "fps": fps,
@@ -119,8 +374,6 @@ class FootballHighlightProcessor:
             "field_info": None,
         }
 
-        frame_count = 0
-
         # Process every nth frame for efficiency
         frame_skip = max(1, int(fps // 5))  # Process 5 frames per second
 
@@ -128,15 +381,42 @@ class FootballHighlightProcessor:
             f"Analyzing {total_frames} frames (processing every {frame_skip} frames)"
         )
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        # Sampled frames waiting for a batched YOLO call
+        pending_frames = []
+        pending_timestamps = []
+
+        sampled_total = -(-total_frames // frame_skip)
+        progress_step = max(1, sampled_total // 10)
+
+        # Decode on a producer thread so it overlaps with inference
+        frame_queue = queue.Queue(maxsize=64)
+        stop_event = threading.Event()
+        producer_errors = []
+        max_gap = max(frame_skip, int(fps * self.config["max_inference_gap"]))
+        producer = threading.Thread(
+            target=self._produce_frames,
+            args=(
+                video_path,
+                frame_skip,
+                max_gap,
+                frame_queue,
+                stop_event,
+                producer_errors,
+            ),
+            daemon=True,
+        )
+        producer.start()
+
+        sample_idx = 0
+        try:
+            while True:
+                item = frame_queue.get()
+                if item is None:
+                    break
 
-            if frame_count % frame_skip == 0:
-                # Analyze this frame
-                frame_data = self.analyze_frame(frame, frame_count / fps)
-                analysis_data["frames"].append(frame_data)
+                frame_count, frame = item
+                pending_frames.append(frame)
+                pending_timestamps.append(frame_count / fps)
 
                 # Detect field on first frame
                 if analysis_data["field_info"] is None:
@@ -144,17 +424,264 @@ class FootballHighlightProcessor:
                         frame
                     )
 
-            frame_count += 1
+                if len(pending_frames) >= self.batch_size:
+                    analysis_data["frames"].extend(
+                        self.analyze_batch(pending_frames, pending_timestamps)
+                    )
+                    pending_frames = []
+                    pending_timestamps = []
+
+                # Progress logging
+                sample_idx += 1
+                if sample_idx % progress_step == 0:
+                    progress = min((frame_count + 1) / total_frames, 1.0) * 100
+                    logger.info(f"Analysis progress: {progress:.1f}%")
+        finally:
+            stop_event.set()
+            producer.join(timeout=5)
+
+        if producer_errors:
+            raise producer_errors[0]
+
+        # Flush the last partial batch
+        if pending_frames:
+            analysis_data["frames"].extend(
+                self.analyze_batch(pending_frames, pending_timestamps)
+            )
 
-            # Progress logging
-            if frame_count % (total_frames // 10) == 0:
-                progress = (frame_count / total_frames) * 100
-                logger.info(f"Analysis progress: {progress:.1f}%")
+        # Parallel per-frame arrays for the highlight detection stage
+        frames = analysis_data["frames"]
+        n_frames = len(frames)
+        analysis_data["timestamps"] = np.fromiter(
+            (f.timestamp for f in frames), dtype=np.float64, count=n_frames
+        )
+        analysis_data["activity_scores"] = np.fromiter(
+            (f.activity_score for f in frames), dtype=np.float32, count=n_frames
+        )
+        analysis_data["ball_detected"] = np.fromiter(
+            (f.ball_detected for f in frames), dtype=bool, count=n_frames
+        )
+        analysis_data["events"] = [f.events for f in frames]
 
-        cap.release()
         return analysis_data
 
-    def analyze_frame(self, frame: np.ndarray, timestamp: float) -> Dict:
+    def _produce_frames(
+        self,
+        video_path: str,
+        frame_skip: int,
+        max_gap: int,
+        frame_queue: queue.Queue,
+        stop_event: threading.Event,
+        errors: List[Exception],
+    ):
+        """Decoder thread: push motion-gated sampled frames onto the queue, then None"""
+        try:
+            sampled_frames = self.iter_sampled_frames(video_path, frame_skip)
+            for item in self.gate_by_motion(sampled_frames, max_gap):
+                while not stop_event.is_set():
+                    try:
+                        frame_queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+                if stop_event.is_set():
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            if not stop_event.is_set():
+                frame_queue.put(None)
+
+    def gate_by_motion(self, sampled_frames, max_gap: int):
+        """
+        Drop sampled frames that barely differ from the previous sample
+
+        Frames are compared on a 64x36 grayscale thumbnail. A frame is kept
+        when the mean absolute difference exceeds ``motion_threshold`` or
+        when ``max_gap`` frames have passed since the last kept frame, so
+        static scenes are still sampled at a low floor rate.
+
+        Args:
+            sampled_frames: Iterable of (frame_index, BGR frame) tuples
+            max_gap: Maximum distance in frames between two kept frames
+
+        Yields:
+            (frame_index, BGR frame) tuples worth running YOLO on
+        """
+        threshold = self.config["motion_threshold"]
+        prev_small = None
+        last_kept = None
+        kept = 0
+        skipped = 0
+
+        for frame_idx, frame in sampled_frames:
+            # Downscale first so the color conversion only touches 64x36 pixels
+            small = cv2.cvtColor(
+                cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA),
+                cv2.COLOR_BGR2GRAY,
+            )
+
+            if (
+                prev_small is None
+                or cv2.mean(cv2.absdiff(small, prev_small))[0] > threshold
+                or frame_idx - last_kept >= max_gap
+            ):
+                last_kept = frame_idx
+                kept += 1
+                yield frame_idx, frame
+            else:
+                skipped += 1
+
+            prev_small = small
+
+        total = kept + skipped
+        if total:
+            logger.info(
+                f"Motion gating skipped {skipped}/{total} sampled frames "
+                f"({skipped / total * 100:.1f}%)"
+            )
+
+    def iter_sampled_frames(self, video_path: str, frame_skip: int):
+        """
+        Decode only every ``frame_skip``-th frame of a video
+
+        Uses decord (NVDEC on CUDA machines) when it is installed and reads
+        the sampled indices directly in batches. Next choice is PyAV with
+        frame-threaded (and, where supported, hardware) decoding, converting
+        only sampled frames to BGR. Otherwise falls back to OpenCV, grabbing
+        skipped frames without retrieving them as BGR.
+
+        Args:
+            video_path: Path to video file
+            frame_skip: Sampling interval in frames
+
+        Yields:
+            (frame_index, BGR frame) tuples
+        """
+        if decord is not None:
+            ctx = decord.gpu(0) if torch.cuda.is_available() else decord.cpu(0)
+            try:
+                reader = decord.VideoReader(video_path, ctx=ctx)
+            except Exception as e:
+                logger.warning(f"decord could not open video, using OpenCV: {e}")
+            else:
+                indices = list(range(0, len(reader), frame_skip))
+                for start in range(0, len(indices), self.batch_size):
+                    chunk = indices[start : start + self.batch_size]
+                    batch = reader.get_batch(chunk).asnumpy()
+                    for frame_idx, rgb in zip(chunk, batch):
+                        yield frame_idx, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+                return
+
+        if av is not None:
+            open_args = {}
+            if HWAccel is not None and torch.cuda.is_available():
+                open_args["hwaccel"] = HWAccel(device_type="cuda")
+            try:
+                container = av.open(video_path, **open_args)
+            except Exception as e:
+                logger.warning(f"PyAV could not open video, using OpenCV: {e}")
+            else:
+                try:
+                    stream = container.streams.video[0]
+                    stream.thread_type = "AUTO"
+                    for frame_idx, av_frame in enumerate(container.decode(stream)):
+                        if frame_idx % frame_skip == 0:
+                            yield frame_idx, av_frame.to_ndarray(format="bgr24")
+                finally:
+                    container.close()
+                return
+
+        cap = cv2.VideoCapture(video_path)
+        frame_count = 0
+
+        try:
+            while True:
+                if frame_count % frame_skip == 0:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    yield frame_count, frame
+                elif not cap.grab():
+                    break
+
+                frame_count += 1
+        finally:
+            cap.release()
+
+    def analyze_batch(
+        self, frames: List[np.ndarray], timestamps: List[float]
+    ) -> List[FrameRecord]:
+        """
+        Analyze several frames with batched YOLO detection and pose calls
+
+        Args:
+            frames: Video frames
+            timestamps: Frame timestamps in seconds
+
+        Returns:
+            Frame analysis data, one entry per input frame
+        """
+        batch, scale = self.prepare_batch(frames)
+
+        with torch.inference_mode(), torch.autocast(
+            "cuda", dtype=torch.float16, enabled=self.use_half
+        ):
+            results = self.model(batch, verbose=False, half=self.use_half)
+            pose_results = self.pose_model(batch, verbose=False, half=self.use_half)
+
+        return [
+            self.analyze_detections(
+                frame,
+                self._extract_detections(result, scale),
+                self.analyze_poses(pose_result, scale),
+                timestamp,
+            )
+            for frame, result, pose_result, timestamp in zip(
+                frames, results, pose_results, timestamps
+            )
+        ]
+
+    def prepare_batch(self, frames: List[np.ndarray]) -> Tuple[object, float]:
+        """
+        Letterbox frames into pinned memory and copy them to the GPU
+
+        The copy runs with ``non_blocking=True`` on a side stream; the
+        default stream waits on it before inference. On CPU the frames are
+        returned unchanged for Ultralytics to preprocess.
+
+        Args:
+            frames: BGR video frames of identical size
+
+        Returns:
+            (batch, scale) where ``batch`` is either the original frames or a
+            (N, 3, imgsz, imgsz) float RGB tensor, and ``scale`` maps
+            model coordinates back to frame pixels by division
+        """
+        if self.pinned_frames is None or len(frames) > len(self.pinned_frames):
+            return frames, 1.0
+
+        height, width = frames[0].shape[:2]
+        scale = self.imgsz / max(height, width)
+        new_w, new_h = int(round(width * scale)), int(round(height * scale))
+
+        staging = self.pinned_frames[: len(frames)]
+        staging[:, new_h:] = 114
+        staging[:, :, new_w:] = 114
+        for i, frame in enumerate(frames):
+            resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+            staging[i, :new_h, :new_w] = torch.from_numpy(resized)
+
+        with torch.cuda.stream(self.copy_stream):
+            gpu_frames = staging.to("cuda", non_blocking=True)
+        torch.cuda.current_stream().wait_stream(self.copy_stream)
+
+        # BGR HWC uint8 -> RGB CHW float in [0, 1]
+        batch = gpu_frames.flip(-1).permute(0, 3, 1, 2).float().div_(255)
+        return batch, scale
+
+    def analyze_frame(self, frame: np.ndarray, timestamp: float) -> FrameRecord:
         """
         Analyze a single frame
 
@@ -165,151 +692,220 @@ class FootballHighlightProcessor:
         Returns:
             Frame analysis data
         """
-        # YOLO detection
-        results = self.model(frame, verbose=False)
-
-        # Extract detections
-        detections = []
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    cls = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    xyxy = box.xyxy[0].cpu().numpy()
-
-                    detection = {
-                        "class": cls,
-                        "class_name": self.model.names[cls],
-                        "confidence": conf,
-                        "bbox": xyxy.tolist(),
-                        "center": [(xyxy[0] + xyxy[2]) / 2, (xyxy[1] + xyxy[3]) / 2],
-                    }
-                    detections.append(detection)
+        return self.analyze_batch([frame], [timestamp])[0]
+
+    def _extract_detections(self, result, scale: float = 1.0) -> List[Dict]:
+        """Convert one YOLO result into detection dictionaries"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+
+        # One device-to-host copy per tensor instead of one per box
+        xyxy = boxes.xyxy.cpu().numpy() / scale
+        confs = boxes.conf.cpu().numpy()
+        classes = boxes.cls.cpu().numpy().astype(int)
+        centers = (xyxy[:, :2] + xyxy[:, 2:]) / 2
+
+        names = self.model.names
+        return [
+            {
+                "class": cls,
+                "class_name": names[cls],
+                "confidence": conf,
+                "bbox": bbox,
+                "center": center,
+            }
+            for cls, conf, bbox, center in zip(
+                classes.tolist(), confs.tolist(), xyxy.tolist(), centers.tolist()
+            )
+        ]
+
+    def analyze_detections(
+        self,
+        frame: np.ndarray,
+        detections: List[Dict],
+        pose_data: List[Dict],
+        timestamp: float,
+    ) -> FrameRecord:
+        """
+        Build frame analysis data from precomputed YOLO detections and poses
 
-        # Analyze player poses
-        pose_data = self.analyze_poses(frame, detections)
+        Args:
+            frame: Video frame
+            detections: YOLO detections for this frame
+            pose_data: Pose analysis data for this frame
+            timestamp: Frame timestamp in seconds
+
+        Returns:
+            Frame analysis data
+        """
+        class_ids = self.get_class_ids(detections)
+        player_count = int((class_ids == self.person_id).sum())
+        ball_detected = bool((class_ids == self.ball_id).any())
 
         # Calculate frame activity score
-        activity_score = self.calculate_activity_score(detections, pose_data)
+        activity_score = self.calculate_activity_score(
+            detections, pose_data, player_count, ball_detected
+        )
 
         # Detect specific events
         events = self.detect_frame_events(detections, pose_data, frame)
 
-        return {
-            "timestamp": timestamp,
-            "detections": detections,
-            "pose_data": pose_data,
-            "activity_score": activity_score,
-            "events": events,
-            "player_count": len([d for d in detections if d["class_name"] == "person"]),
-            "ball_detected": any(d["class_name"] == "sports ball" for d in detections),
-        }
+        return FrameRecord(
+            timestamp=timestamp,
+            detections=detections,
+            pose_data=pose_data,
+            activity_score=activity_score,
+            events=events,
+            player_count=player_count,
+            ball_detected=ball_detected,
+        )
+
+    def get_class_ids(self, detections: List[Dict]) -> np.ndarray:
+        """Collect detection class ids into an integer array"""
+        return np.fromiter(
+            (d["class"] for d in detections), dtype=np.int16, count=len(detections)
+        )
 
-    def analyze_poses(self, frame: np.ndarray, detections: List[Dict]) -> List[Dict]:
+    def analyze_poses(self, pose_result, scale: float = 1.0) -> List[Dict]:
         """
-        Analyze player poses using MediaPipe
+        Analyze player poses from a YOLO pose result
+
+        Keypoints are normalized to each player's bounding box so the pose
+        features keep the same scale regardless of player size.
 
         Args:
-            frame: Video frame
-            detections: YOLO detections
+            pose_result: YOLO pose result for one frame
+            scale: Model-input to frame scale factor (see ``prepare_batch``)
 
         Returns:
             List of pose analysis data
         """
         pose_data = []
 
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if pose_result.keypoints is None or pose_result.boxes is None:
+            return pose_data
 
-        for detection in detections:
-            if detection["class_name"] == "person":
-                # Extract person region
-                bbox = detection["bbox"]
-                x1, y1, x2, y2 = map(int, bbox)
-                person_roi = rgb_frame[y1:y2, x1:x2]
-
-                if person_roi.size > 0:
-                    # Analyze pose
-                    results = self.pose.process(person_roi)
-
-                    if results.pose_landmarks:
-                        # Extract key pose features
-                        landmarks = results.pose_landmarks.landmark
-
-                        # Calculate pose features
-                        pose_features = self.extract_pose_features(landmarks)
-
-                        pose_data.append(
-                            {
-                                "detection_id": len(pose_data),
-                                "bbox": bbox,
-                                "landmarks": [(lm.x, lm.y, lm.z) for lm in landmarks],
-                                "features": pose_features,
-                            }
-                        )
+        boxes = pose_result.boxes.xyxy.cpu().numpy() / scale
+        keypoints = pose_result.keypoints.xy.cpu().numpy() / scale
+
+        if len(boxes) == 0:
+            return pose_data
+
+        sizes = np.maximum(boxes[:, 2:] - boxes[:, :2], 1.0)
+        landmarks = (keypoints - boxes[:, None, :2]) / sizes[:, None, :]
+
+        features = self.extract_pose_features(landmarks)
+
+        for i, (bbox, player_landmarks) in enumerate(zip(boxes, landmarks)):
+            pose_data.append(
+                {
+                    "detection_id": i,
+                    "bbox": bbox.tolist(),
+                    "landmarks": player_landmarks.tolist(),
+                    "features": features[i],
+                }
+            )
 
         return pose_data
 
-    def extract_pose_features(self, landmarks) -> Dict:
+    def extract_pose_features(self, landmarks: np.ndarray) -> List[Dict]:
         """
-        Extract meaningful features from pose landmarks
+        Extract meaningful features from pose landmarks of all players at once
 
         Args:
-            landmarks: MediaPipe pose landmarks
+            landmarks: COCO-17 keypoints as a (P, 17, 2) array
 
         Returns:
-            Dictionary of pose features
+            List of pose feature dictionaries, one per player
         """
-        # Key landmark indices
-        LEFT_SHOULDER = 11
-        RIGHT_SHOULDER = 12
-        LEFT_HIP = 23
-        RIGHT_HIP = 24
-        LEFT_KNEE = 25
-        RIGHT_KNEE = 26
-        LEFT_ANKLE = 27
-        RIGHT_ANKLE = 28
-
-        features = {}
+        # Key landmark indices (COCO-17)
+        LEFT_SHOULDER = 5
+        RIGHT_SHOULDER = 6
+        LEFT_HIP = 11
+        RIGHT_HIP = 12
+        LEFT_KNEE = 13
+        RIGHT_KNEE = 14
+        LEFT_ANKLE = 15
+        RIGHT_ANKLE = 16
+
+        if landmarks.ndim != 3 or landmarks.shape[1] <= RIGHT_ANKLE:
+            # Handle missing landmarks
+            return [
+                {
+                    "body_lean": 0,
+                    "leg_spread": 0,
+                    "knee_bend": 0,
+                    "action_type": "unknown",
+                }
+                for _ in range(len(landmarks))
+            ]
 
-        try:
-            # Body orientation
-            shoulder_center = (
-                (landmarks[LEFT_SHOULDER].x + landmarks[RIGHT_SHOULDER].x) / 2,
-                (landmarks[LEFT_SHOULDER].y + landmarks[RIGHT_SHOULDER].y) / 2,
-            )
-            hip_center = (
-                (landmarks[LEFT_HIP].x + landmarks[RIGHT_HIP].x) / 2,
-                (landmarks[LEFT_HIP].y + landmarks[RIGHT_HIP].y) / 2,
-            )
+        L = landmarks
 
-            # Calculate body lean
-            body_lean = abs(shoulder_center[0] - hip_center[0])
-            features["body_lean"] = body_lean
+        # Body orientation
+        shoulder_center_x = (L[:, LEFT_SHOULDER, 0] + L[:, RIGHT_SHOULDER, 0]) / 2
+        hip_center_x = (L[:, LEFT_HIP, 0] + L[:, RIGHT_HIP, 0]) / 2
+        body_lean = np.abs(shoulder_center_x - hip_center_x)
 
-            # Leg spread (running/action indicator)
-            leg_spread = abs(landmarks[LEFT_ANKLE].x - landmarks[RIGHT_ANKLE].x)
-            features["leg_spread"] = leg_spread
+        # Leg spread (running/action indicator)
+        leg_spread = np.abs(L[:, LEFT_ANKLE, 0] - L[:, RIGHT_ANKLE, 0])
 
-            # Knee bend (action intensity)
-            left_knee_bend = abs(landmarks[LEFT_KNEE].y - landmarks[LEFT_ANKLE].y)
-            right_knee_bend = abs(landmarks[RIGHT_KNEE].y - landmarks[RIGHT_ANKLE].y)
-            features["knee_bend"] = (left_knee_bend + right_knee_bend) / 2
+        # Knee bend (action intensity)
+        knee_bend = (
+            np.abs(L[:, LEFT_KNEE, 1] - L[:, LEFT_ANKLE, 1])
+            + np.abs(L[:, RIGHT_KNEE, 1] - L[:, RIGHT_ANKLE, 1])
+        ) / 2
 
-            # Action classification
-            features["action_type"] = self.classify_action(features)
+        # Action classification
+        action_types = self.classify_actions(body_lean, leg_spread, knee_bend)
 
-        except (IndexError, AttributeError):
-            # Handle missing landmarks
-            features = {
-                "body_lean": 0,
-                "leg_spread": 0,
-                "knee_bend": 0,
-                "action_type": "unknown",
+        return [
+            {
+                "body_lean": float(lean),
+                "leg_spread": float(spread),
+                "knee_bend": float(bend),
+                "action_type": ACTION_TYPES[code],
             }
+            for lean, spread, bend, code in zip(
+                body_lean, leg_spread, knee_bend, action_types.tolist()
+            )
+        ]
+
+    def classify_actions(
+        self, body_lean: np.ndarray, leg_spread: np.ndarray, knee_bend: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized version of ``classify_action`` over all players
 
-        return features
+        Args:
+            body_lean: Body lean per player
+            leg_spread: Leg spread per player
+            knee_bend: Knee bend per player
+
+        Returns:
+            Array of action codes indexing ``ACTION_TYPES``
+        """
+        if numba is None:
+            return np.select(
+                [
+                    (knee_bend > 0.3) & (leg_spread > 0.2),
+                    body_lean > 0.2,
+                    knee_bend > 0.4,
+                    (leg_spread < 0.1) & (knee_bend < 0.1),
+                ],
+                [0, 1, 2, 3],
+                default=4,
+            ).astype(np.int8)
+
+        codes = np.empty(len(body_lean), dtype=np.int8)
+        _classify_actions(
+            np.ascontiguousarray(body_lean, dtype=np.float64),
+            np.ascontiguousarray(leg_spread, dtype=np.float64),
+            np.ascontiguousarray(knee_bend, dtype=np.float64),
+            codes,
+        )
+        return codes
 
     def classify_action(self, pose_features: Dict) -> str:
         """
@@ -338,7 +934,11 @@ class FootballHighlightProcessor:
             return "walking"
 
     def calculate_activity_score(
-        self, detections: List[Dict], pose_data: List[Dict]
+        self,
+        detections: List[Dict],
+        pose_data: List[Dict],
+        player_count: Optional[int] = None,
+        ball_detected: Optional[bool] = None,
     ) -> float:
         """
         Calculate overall activity score for the frame
@@ -346,18 +946,24 @@ class FootballHighlightProcessor:
         Args:
             detections: YOLO detections
             pose_data: Pose analysis data
+            player_count: Precomputed person count (derived if None)
+            ball_detected: Precomputed ball flag (derived if None)
 
         Returns:
             Activity score (0-1)
         """
+        if player_count is None or ball_detected is None:
+            class_ids = self.get_class_ids(detections)
+            player_count = int((class_ids == self.person_id).sum())
+            ball_detected = bool((class_ids == self.ball_id).any())
+
         score = 0.0
 
         # Player count contributes to activity
-        player_count = len([d for d in detections if d["class_name"] == "person"])
         score += min(player_count / 10, 0.3)  # Max 0.3 for player count
 
         # Ball detection
-        if any(d["class_name"] == "sports ball" for d in detections):
+        if ball_detected:
             score += 0.2
 
         # Pose-based activity
@@ -400,33 +1006,71 @@ class FootballHighlightProcessor:
         # Find ball and players
         ball = None
         players = []
+        ball_id = self.ball_id
+        person_id = self.person_id
 
         for detection in detections:
-            if detection["class_name"] == "sports ball":
+            cls = detection["class"]
+            if cls == ball_id:
                 ball = detection
-            elif detection["class_name"] == "person":
+            elif cls == person_id:
                 players.append(detection)
 
         # Goal area detection (simplified)
         if ball:
-            ball_x, ball_y = ball["center"]
+            ball_x = ball["center"][0]
             frame_width = frame.shape[1]
+            left_goal_x = frame_width * 0.1
+            right_goal_x = frame_width * 0.9
 
             # Check if ball is near goal areas (left/right edges)
-            if ball_x < frame_width * 0.1 or ball_x > frame_width * 0.9:
+            if ball_x < left_goal_x or ball_x > right_goal_x:
                 events.append(
                     {
                         "type": "ball_near_goal",
                         "confidence": 0.7,
-                        "location": "left" if ball_x < frame_width * 0.5 else "right",
+                        "location": "left" if ball_x < left_goal_x else "right",
                     }
                 )
 
-        # Celebration detection (multiple players with raised arms)
-        celebrating_players = 0
+        # Players contesting the ball (spatial index over player centers)
+        if ball and len(players) >= self.config["ball_contest_min_players"]:
+            player_tree = cKDTree(np.array([p["center"] for p in players]))
+            nearby = player_tree.query_ball_point(
+                ball["center"], r=self.config["ball_contest_radius"]
+            )
+
+            if len(nearby) >= self.config["ball_contest_min_players"]:
+                events.append(
+                    {
+                        "type": "ball_contest",
+                        "confidence": min(len(nearby) / 6, 1.0),
+                        "player_count": len(nearby),
+                    }
+                )
+
+        # Collect jumping players and count running ones in one pass
+        jumping_centers = []
+        running_players = 0
         for pose in pose_data:
-            if pose["features"]["action_type"] == "jumping":
-                celebrating_players += 1
+            action_type = pose["features"]["action_type"]
+            if action_type == "jumping":
+                x1, y1, x2, y2 = pose["bbox"]
+                jumping_centers.append(((x1 + x2) / 2, (y1 + y2) / 2))
+            elif action_type == "running":
+                running_players += 1
+
+        # Celebration detection (a group of players with raised arms); jumps
+        # spread across the pitch are not one celebration
+        celebrating_players = 0
+        if len(jumping_centers) >= 2:
+            labels = self.action_classifier.cluster_trajectories(
+                np.array(jumping_centers),
+                eps=self.config["celebration_radius"],
+                min_samples=2,
+            )
+            if labels.max() >= 0:
+                celebrating_players = int(np.bincount(labels[labels >= 0]).max())
 
         if celebrating_players >= 2:
             events.append(
@@ -438,10 +1082,6 @@ class FootballHighlightProcessor:
             )
 
         # Fast movement detection
-        running_players = len(
-            [pose for pose in pose_data if pose["features"]["action_type"] == "running"]
-        )
-
         if running_players >= 3:
             events.append(
                 {
@@ -463,40 +1103,44 @@ class FootballHighlightProcessor:
         Returns:
             List of highlight moments
         """
-        frames = analysis_data["frames"]
-        fps = analysis_data["fps"]
-
-        # Extract activity scores
-        activity_scores = [frame["activity_score"] for frame in frames]
-        timestamps = [frame["timestamp"] for frame in frames]
+        activity_scores = analysis_data["activity_scores"]
+        timestamps = analysis_data["timestamps"]
+        frame_events = analysis_data["events"]
+
+        # Motion gating leaves the samples unevenly spaced, so every window
+        # below is measured on the timestamps instead of in sample counts
+        peaks, _ = find_peaks(activity_scores, height=self.config["activity_threshold"])
+        peaks = self.select_peaks_by_time(
+            peaks, activity_scores, timestamps, min_gap=5.0
+        )
 
-        # Find peaks in activity
-        peaks, properties = find_peaks(
-            activity_scores,
-            height=self.config["activity_threshold"],
-            distance=int(fps * 5),  # Minimum 5 seconds between peaks
+        # Each sample stands in for the gated-out frames up to the next one;
+        # prefix sum of high-activity seconds for O(1) window totals
+        sample_seconds = np.maximum(
+            np.diff(timestamps, append=analysis_data["duration"]), 0.0
+        )
+        high_activity_cumsum = np.concatenate(
+            ([0.0], np.cumsum((activity_scores > 0.5) * sample_seconds))
         )
 
         highlight_moments = []
 
         for peak_idx in peaks:
-            peak_timestamp = timestamps[peak_idx]
-            peak_score = activity_scores[peak_idx]
+            peak_timestamp = float(timestamps[peak_idx])
+            peak_score = float(activity_scores[peak_idx])
 
-            # Analyze events around the peak
-            start_idx = max(0, peak_idx - int(fps * 2))
-            end_idx = min(len(frames), peak_idx + int(fps * 2))
+            # Analyze events within 2 seconds of the peak
+            start_idx = np.searchsorted(timestamps, peak_timestamp - 2.0, side="left")
+            end_idx = np.searchsorted(timestamps, peak_timestamp + 2.0, side="right")
 
-            peak_events = []
-            for i in range(start_idx, end_idx):
-                peak_events.extend(frames[i]["events"])
+            peak_events = list(chain.from_iterable(frame_events[start_idx:end_idx]))
 
             # Classify highlight type
             highlight_type = self.classify_highlight(peak_events, peak_score)
 
             # Determine highlight duration
             duration = self.calculate_highlight_duration(
-                frames, peak_idx, highlight_type
+                high_activity_cumsum, timestamps, peak_idx, highlight_type
             )
 
             highlight_moments.append(
@@ -517,6 +1161,45 @@ class FootballHighlightProcessor:
         highlight_moments.sort(key=lambda x: x["score"], reverse=True)
         return highlight_moments[:10]  # Top 10 highlights
 
+    def select_peaks_by_time(
+        self,
+        peaks: np.ndarray,
+        scores: np.ndarray,
+        timestamps: np.ndarray,
+        min_gap: float,
+    ) -> np.ndarray:
+        """
+        Keep the highest peaks that are at least ``min_gap`` seconds apart
+
+        Same rule as the ``distance`` argument of ``find_peaks``, but on the
+        sample timestamps rather than on sample indices.
+
+        Args:
+            peaks: Sorted sample indices of candidate peaks
+            scores: Activity score per sample
+            timestamps: Timestamp per sample in seconds (increasing)
+            min_gap: Minimum time between two kept peaks in seconds
+
+        Returns:
+            Sorted sample indices of the kept peaks
+        """
+        if len(peaks) < 2:
+            return peaks
+
+        peak_times = timestamps[peaks]
+        keep = np.ones(len(peaks), dtype=bool)
+
+        # Visit the highest peaks first and drop their close neighbours
+        for i in np.argsort(scores[peaks], kind="stable")[::-1]:
+            if not keep[i]:
+                continue
+            lo = np.searchsorted(peak_times, peak_times[i] - min_gap, side="right")
+            hi = np.searchsorted(peak_times, peak_times[i] + min_gap, side="left")
+            keep[lo:i] = False
+            keep[i + 1 : hi] = False
+
+        return peaks[keep]
+
     def classify_highlight(self, events: List[Dict], activity_score: float) -> str:
         """
         Classify the type of highlight based on events
@@ -545,14 +1228,20 @@ class FootballHighlightProcessor:
             return "general"
 
     def calculate_highlight_duration(
-        self, frames: List[Dict], peak_idx: int, highlight_type: str
+        self,
+        high_activity_cumsum: np.ndarray,
+        timestamps: np.ndarray,
+        peak_idx: int,
+        highlight_type: str,
     ) -> float:
         """
         Calculate optimal duration for highlight
 
         Args:
-            frames: Frame analysis data
-            peak_idx: Peak frame index
+            high_activity_cumsum: Prefix sum of seconds covered by samples with
+                activity > 0.5, with a leading zero (length = sample count + 1)
+            timestamps: Timestamp per sample in seconds (increasing)
+            peak_idx: Peak sample index
             highlight_type: Type of highlight
 
         Returns:
@@ -570,18 +1259,21 @@ class FootballHighlightProcessor:
         base_duration = base_durations.get(highlight_type, 10)
 
         # Extend duration based on surrounding activity
-        activity_window = 30  # frames to check around peak
-        start_check = max(0, peak_idx - activity_window)
-        end_check = min(len(frames), peak_idx + activity_window)
-
-        high_activity_frames = sum(
-            1
-            for i in range(start_check, end_check)
-            if frames[i]["activity_score"] > 0.5
+        activity_window = 6.0  # seconds to check on each side of the peak
+        peak_timestamp = timestamps[peak_idx]
+        start_check = np.searchsorted(
+            timestamps, peak_timestamp - activity_window, side="left"
+        )
+        end_check = np.searchsorted(
+            timestamps, peak_timestamp + activity_window, side="right"
+        )
+
+        high_activity_seconds = float(
+            high_activity_cumsum[end_check] - high_activity_cumsum[start_check]
         )
 
         # Extend duration if there's sustained activity
-        if high_activity_frames > activity_window * 0.7:
+        if high_activity_seconds > activity_window * 0.7:
             base_duration += 5
 
         return min(
@@ -604,31 +1296,49 @@ class FootballHighlightProcessor:
         Returns:
             Highlight information dictionary
         """
-        start_time = highlight_moment["start_time"]
-        end_time = highlight_moment["end_time"]
-        duration = end_time - start_time
-
-        # Generate output filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = (
-            f"highlight_{clip_index}_{highlight_moment['type']}_{timestamp}.mp4"
+        highlights = self.create_highlight_clips(
+            video_path, [highlight_moment], output_dir, first_index=clip_index
         )
-        output_path = os.path.join(output_dir, output_filename)
+        return highlights[0] if highlights else None
+
+    def create_highlight_clips(
+        self,
+        video_path: str,
+        highlight_moments: List[Dict],
+        output_dir: str,
+        first_index: int = 0,
+    ) -> List[Dict]:
+        """
+        Create all highlight clips and thumbnails with a single ffmpeg process
+
+        Each highlight gets its own input with ``-ss`` before ``-i`` so ffmpeg
+        seeks by keyframe index instead of decoding from the start of the
+        file. The clip and its thumbnail are both written from that input.
+        By default (``clip_stream_copy``) clips are remuxed with ``-c copy``
+        and only the thumbnails are decoded. Cut points then snap to the
+        previous keyframe, so a clip can start up to one GOP early; disable
+        the option to re-encode with libx264 and cut at ``start_time``.
+        If the combined process fails, each clip is retried with its own
+        ffmpeg call and only clips that were written are returned.
 
-        # Create thumbnail filename
-        thumbnail_filename = output_filename.replace(".mp4", "_thumb.jpg")
-        thumbnail_path = os.path.join(output_dir, thumbnail_filename)
+        Args:
+            video_path: Source video path
+            highlight_moments: Highlight moment data
+            output_dir: Output directory
+            first_index: Index used to name the first clip
 
-        try:
-            # Extract video clip using ffmpeg
-            cmd = [
-                "ffmpeg",
-                "-i",
-                video_path,
-                "-ss",
-                str(start_time),
-                "-t",
-                str(duration),
+        Returns:
+            List of highlight information dictionaries
+        """
+        if not highlight_moments:
+            return []
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if self.config["clip_stream_copy"]:
+            codec_args = ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+        else:
+            codec_args = [
                 "-c:v",
                 "libx264",
                 "-c:a",
@@ -637,52 +1347,140 @@ class FootballHighlightProcessor:
                 "fast",
                 "-crf",
                 "23",
-                "-y",
-                output_path,
             ]
 
-            subprocess.run(cmd, check=True, capture_output=True)
+        clips = []
 
-            # Create thumbnail
-            thumbnail_time = start_time + duration / 2
-            thumb_cmd = [
-                "ffmpeg",
-                "-i",
-                video_path,
-                "-ss",
-                str(thumbnail_time),
-                "-vframes",
-                "1",
-                "-q:v",
-                "2",
-                "-y",
-                thumbnail_path,
-            ]
+        for input_idx, highlight_moment in enumerate(highlight_moments):
+            # Generate output filename
+            clip_index = first_index + input_idx
+            output_filename = (
+                f"highlight_{clip_index}_{highlight_moment['type']}_{timestamp}.mp4"
+            )
+            output_path = os.path.join(output_dir, output_filename)
 
-            subprocess.run(thumb_cmd, check=True, capture_output=True)
+            # Create thumbnail filename
+            thumbnail_filename = output_filename.replace(".mp4", "_thumb.jpg")
+            thumbnail_path = os.path.join(output_dir, thumbnail_filename)
 
-            # Generate title and description
-            title = self.generate_highlight_title(highlight_moment)
-            description = self.generate_highlight_description(highlight_moment)
-            tags = self.generate_highlight_tags(highlight_moment)
+            clips.append((highlight_moment, output_path, thumbnail_path))
 
-            return {
-                "title": title,
-                "description": description,
-                "video_path": output_path,
-                "thumbnail_path": thumbnail_path,
-                "start_timestamp": start_time,
-                "end_timestamp": end_time,
-                "duration": duration,
-                "type": highlight_moment["type"],
-                "score": highlight_moment["score"],
-                "tags": tags,
-                "events": highlight_moment["events"],
-            }
+        cmd = ["ffmpeg", "-y"]
+        output_args = []
+        for input_idx, clip in enumerate(clips):
+            clip_inputs, clip_outputs = self.clip_ffmpeg_args(
+                video_path, *clip, input_idx, codec_args
+            )
+            cmd += clip_inputs
+            output_args += clip_outputs
+        cmd += output_args
 
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to create highlight clip: {e}")
-            return None
+            # One bad clip fails the whole process; redo them one at a time
+            logger.warning(f"Batched clip extraction failed, retrying per clip: {e}")
+            for clip in clips:
+                clip_inputs, clip_outputs = self.clip_ffmpeg_args(
+                    video_path, *clip, 0, codec_args
+                )
+                try:
+                    subprocess.run(
+                        ["ffmpeg", "-y"] + clip_inputs + clip_outputs,
+                        check=True,
+                        capture_output=True,
+                    )
+                except subprocess.CalledProcessError as clip_error:
+                    logger.error(
+                        f"Failed to create highlight clip {clip[1]}: {clip_error}"
+                    )
+                    # Drop whatever the failed batch left behind
+                    if os.path.exists(clip[1]):
+                        os.remove(clip[1])
+
+        return [
+            self.build_highlight_info(highlight_moment, output_path, thumbnail_path)
+            for highlight_moment, output_path, thumbnail_path in clips
+            if os.path.exists(output_path) and os.path.getsize(output_path) > 0
+        ]
+
+    def clip_ffmpeg_args(
+        self,
+        video_path: str,
+        highlight_moment: Dict,
+        output_path: str,
+        thumbnail_path: str,
+        input_idx: int,
+        codec_args: List[str],
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Build the ffmpeg input and output arguments for one highlight clip
+
+        Args:
+            video_path: Source video path
+            highlight_moment: Highlight moment data
+            output_path: Clip output path
+            thumbnail_path: Thumbnail output path
+            input_idx: Index of this clip's input in the ffmpeg command
+            codec_args: Codec arguments for the clip output
+
+        Returns:
+            (input arguments, output arguments)
+        """
+        start_time = highlight_moment["start_time"]
+        duration = highlight_moment["end_time"] - start_time
+
+        input_args = ["-ss", str(start_time), "-t", str(duration), "-i", video_path]
+
+        output_args = [
+            "-map",
+            f"{input_idx}:v:0",
+            "-map",
+            f"{input_idx}:a:0?",
+            *codec_args,
+            output_path,
+        ]
+
+        # Thumbnail from the middle of the clip
+        output_args += [
+            "-map",
+            f"{input_idx}:v:0",
+            "-ss",
+            str(duration / 2),
+            "-frames:v",
+            "1",
+            "-q:v",
+            "2",
+            thumbnail_path,
+        ]
+
+        return input_args, output_args
+
+    def build_highlight_info(
+        self, highlight_moment: Dict, output_path: str, thumbnail_path: str
+    ) -> Dict:
+        """Build the highlight information dictionary for a rendered clip"""
+        start_time = highlight_moment["start_time"]
+        end_time = highlight_moment["end_time"]
+
+        # Generate title and description
+        title = self.generate_highlight_title(highlight_moment)
+        description = self.generate_highlight_description(highlight_moment)
+        tags = self.generate_highlight_tags(highlight_moment)
+
+        return {
+            "title": title,
+            "description": description,
+            "video_path": output_path,
+            "thumbnail_path": thumbnail_path,
+            "start_timestamp": start_time,
+            "end_timestamp": end_time,
+            "duration": end_time - start_time,
+            "type": highlight_moment["type"],
+            "score": highlight_moment["score"],
+            "tags": tags,
+            "events": highlight_moment["events"],
+        }
 
     def generate_highlight_title(self, highlight_moment: Dict) -> str:
         """Generate a title for the highlight"""
@@ -734,18 +1532,26 @@ class FootballHighlightProcessor:
 class FieldDetector:
     """Detects and analyzes the football field"""
 
-    def detect_field(self, frame: np.ndarray) -> Dict:
+    def detect_field(self, frame: np.ndarray, scale: int = 4) -> Dict:
         """
         Detect field boundaries and key areas
 
         Args:
             frame: Video frame
+            scale: Downsampling factor; only coarse bounds are needed
 
         Returns:
-            Field information dictionary
+            Field information dictionary (coordinates in full-frame pixels)
         """
+        scale = max(1, scale)
+        small = cv2.resize(
+            frame,
+            (max(1, frame.shape[1] // scale), max(1, frame.shape[0] // scale)),
+            interpolation=cv2.INTER_AREA,
+        )
+
         # Convert to HSV for better grass detection
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
 
         # Define green color range for grass
         lower_green = np.array([35, 40, 40])
@@ -763,6 +1569,7 @@ class FieldDetector:
 
             # Get bounding rectangle
             x, y, w, h = cv2.boundingRect(largest_contour)
+            x, y, w, h = x * scale, y * scale, w * scale, h * scale
 
             return {
                 "field_bounds": [x, y, x + w, y + h],
@@ -784,7 +1591,8 @@ class ActionClassifier:
         Classify a sequence of poses as an action
 
         Args:
-            pose_sequence: Sequence of pose data
+            pose_sequence: Pose data of one player over consecutive samples
+                (``bbox`` and box-normalized ``landmarks`` per entry)
 
         Returns:
             Action classification
@@ -792,36 +1600,90 @@ class ActionClassifier:
         if len(pose_sequence) < 3:
             return "unknown"
 
-        # Analyze movement patterns
+        # Landmarks are normalized to each player's box, which would only
+        # measure limb motion; map them back to frame coordinates and express
+        # them in body heights so the thresholds do not depend on player size
+        boxes = np.array([pose["bbox"] for pose in pose_sequence], dtype=np.float32)
+        sizes = np.maximum(boxes[:, 2:] - boxes[:, :2], 1.0)
+        body_height = float(np.median(sizes[:, 1]))
+        keypoints = [
+            (np.asarray(pose["landmarks"], dtype=np.float32) * size + box[:2])
+            / body_height
+            for pose, box, size in zip(pose_sequence, boxes, sizes)
+        ]
+
         movements = []
-        for i in range(1, len(pose_sequence)):
-            prev_pose = pose_sequence[i - 1]
-            curr_pose = pose_sequence[i]
+        for i in range(1, len(keypoints)):
+            prev_keypoints = keypoints[i - 2] if i >= 2 else None
 
             # Calculate movement features
-            movement = self.calculate_movement(prev_pose, curr_pose)
+            movement = self.calculate_movement(
+                keypoints[i - 1], keypoints[i], prev_keypoints
+            )
             movements.append(movement)
 
         # Classify based on movement patterns
         return self.classify_movement_pattern(movements)
 
-    def calculate_movement(self, pose1: Dict, pose2: Dict) -> Dict:
-        """Calculate movement between two poses"""
-        # Simplified movement calculation
+    def calculate_movement(
+        self,
+        kp1: np.ndarray,
+        kp2: np.ndarray,
+        kp0: Optional[np.ndarray] = None,
+    ) -> Dict:
+        """
+        Calculate movement between two poses
+
+        Keypoints must share one coordinate frame across poses (not the
+        per-box normalized landmarks); speed and acceleration come out in
+        the same units per pose step.
+
+        Args:
+            kp1: Keypoints of the earlier pose, shape (K, 2)
+            kp2: Keypoints of the later pose, shape (K, 2)
+            kp0: Keypoints of the pose before ``kp1`` (for acceleration)
+
+        Returns:
+            Movement features (speed, direction in degrees, acceleration)
+        """
+        displacement = (kp2 - kp1).mean(axis=0)
+
+        acceleration = 0.0
+        if kp0 is not None:
+            acceleration = float(np.linalg.norm((kp2 - 2 * kp1 + kp0).mean(axis=0)))
+
         return {
-            "speed": np.random.random(),  # Placeholder
-            "direction": np.random.random() * 360,  # Placeholder
-            "acceleration": np.random.random(),  # Placeholder
+            "speed": float(np.linalg.norm(displacement)),
+            "direction": float(
+                np.degrees(np.arctan2(displacement[1], displacement[0])) % 360
+            ),
+            "acceleration": acceleration,
         }
 
+    def cluster_trajectories(
+        self, positions: np.ndarray, eps: float = 50.0, min_samples: int = 3
+    ) -> np.ndarray:
+        """
+        Group player positions into spatial clusters (celebrations, formations)
+
+        Args:
+            positions: (N, 2) array of player centers in pixels
+            eps: Maximum distance between neighbouring players
+            min_samples: Minimum group size for a cluster core
+
+        Returns:
+            (N,) array of cluster labels, -1 for isolated players
+        """
+        return grid_dbscan(positions, eps, min_samples)
+
     def classify_movement_pattern(self, movements: List[Dict]) -> str:
-        """Classify movement pattern"""
+        """Classify movement pattern from speeds in body heights per pose step"""
         # Simplified classification
         avg_speed = np.mean([m["speed"] for m in movements])
 
-        if avg_speed > 0.7:
+        if avg_speed > 0.5:
             return "running"
-        elif avg_speed > 0.4:
+        elif avg_speed > 0.1:
             return "walking"
         else:
             return "standing"
@@ -3,16 +3,41 @@
 Camera Selector Tool - Find and select available cameras
 """
 
+import argparse
+import json
+import os
+import sys
 import cv2
+import numpy as np
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+CACHE_PATH = Path.home() / ".cache" / "camera_selector.json"
+
+
+def open_camera(index):
+    """Open a camera index, or return None if it has no device node
+
+    On Linux an absent /dev/videoN is skipped without the slow driver
+    probe, and V4L2 is used directly instead of trying other backends.
+    """
+    if sys.platform.startswith("linux"):
+        if not os.path.exists(f"/dev/video{index}"):
+            return None
+        return cv2.VideoCapture(index, cv2.CAP_V4L2)
+    return cv2.VideoCapture(index)
 
 
 def test_camera(index):
     """Test if a camera index works and get its properties"""
     try:
-        cap = cv2.VideoCapture(index)
-        if not cap.isOpened():
+        cap = open_camera(index)
+        if cap is None or not cap.isOpened():
             return None
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
         # Try to read a frame
         ret, frame = cap.read()
@@ -38,6 +63,38 @@ def test_camera(index):
         return None
 
 
+def camera_still_available(camera):
+    """Quickly confirm a cached camera still opens and delivers a frame"""
+    try:
+        cap = open_camera(camera["index"])
+        if cap is None:
+            return None
+        ok = cap.isOpened() and cap.read()[0]
+        cap.release()
+        return camera if ok else None
+    except Exception:
+        return None
+
+
+def load_camera_cache():
+    """Load cameras found by a previous scan, or an empty list"""
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def save_camera_cache(cameras):
+    """Persist scan results so the next run can skip the full probe"""
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_PATH, "w") as f:
+            json.dump(cameras, f, indent=2)
+    except OSError as e:
+        print(f"⚠️ Could not save camera cache: {e}")
+
+
 def get_camera_name(index):
     """Get a descriptive name for the camera"""
     if index == 0:
@@ -46,31 +103,83 @@ def get_camera_name(index):
         return f"External Camera #{index} (USB/Phone)"
 
 
-def find_all_cameras():
-    """Find all available cameras"""
+def find_all_cameras(max_index=10, rescan=False):
+    """Find all available cameras
+
+    Failed probes can block for a second or more each, so all indices are
+    probed in parallel; OpenCV releases the GIL while opening the device.
+    Cameras cached by a previous scan are reused if they still open,
+    unless ``rescan`` is set.
+    """
+    cached = [] if rescan else load_camera_cache()
+    if cached:
+        print("🔍 Checking cached cameras...")
+        with ThreadPoolExecutor(max_workers=len(cached)) as executor:
+            cameras = [c for c in executor.map(camera_still_available, cached) if c]
+        if len(cameras) == len(cached):
+            for camera in cameras:
+                print(f"  Camera {camera['index']}: ✅ Found: {camera['name']}")
+            return cameras
+        print("  Cached cameras changed, rescanning")
+
     print("🔍 Scanning for available cameras...")
     cameras = []
 
     # Check camera indices 0-9
-    for i in range(10):
-        print(f"  Testing camera {i}...", end=" ")
-        camera_info = test_camera(i)
-        if camera_info:
-            cameras.append(camera_info)
-            print(f"✅ Found: {camera_info['name']}")
-        else:
-            print("❌")
-
+    with ThreadPoolExecutor(max_workers=max_index) as executor:
+        futures = {executor.submit(test_camera, i): i for i in range(max_index)}
+        for future in as_completed(futures):
+            camera_info = future.result()
+            if camera_info:
+                cameras.append(camera_info)
+                print(f"  Camera {futures[future]}: ✅ Found: {camera_info['name']}")
+            else:
+                print(f"  Camera {futures[future]}: ❌")
+
+    cameras.sort(key=lambda c: c["index"])
+    save_camera_cache(cameras)
     return cameras
 
 
+def grab_frames(cap, latest_frame, stop_event):
+    """Keep only the newest camera frame so display never stalls capture"""
+    while not stop_event.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            latest_frame.append(None)
+            break
+        latest_frame.append(frame)
+
+
+def render_overlay(camera_index, width, height):
+    """Draw the preview text once and return the bands of rows it covers
+
+    Returns a list of (y0, y1, pixels, mask) so each frame only needs a
+    masked copy of those bands instead of re-rasterizing the text.
+    """
+    lines = [
+        (f"Camera {camera_index}: {width}x{height}", (10, 30), 1, (0, 255, 0)),
+        ("Press 'q' to quit, 's' for screenshot", (10, height - 20), 0.6, (255,) * 3),
+    ]
+    bands = []
+    for text, origin, scale, color in lines:
+        overlay = np.zeros((height, width, 3), dtype=np.uint8)
+        cv2.putText(overlay, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2)
+        mask = overlay.any(axis=2, keepdims=True)
+        rows = np.flatnonzero(mask.any(axis=(1, 2)))
+        if rows.size:
+            y0, y1 = rows[0], rows[-1] + 1
+            bands.append((y0, y1, overlay[y0:y1], mask[y0:y1]))
+    return bands
+
+
 def preview_camera(camera_index):
     """Preview a specific camera"""
     print(f"\n📹 Previewing camera {camera_index}...")
     print("Press 'q' to quit preview, 's' for screenshot")
 
-    cap = cv2.VideoCapture(camera_index)
-    if not cap.isOpened():
+    cap = open_camera(camera_index)
+    if cap is None or not cap.isOpened():
         print("❌ Could not open camera")
         return
 
@@ -79,12 +188,25 @@ def preview_camera(camera_index):
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
 
+    latest_frame = deque(maxlen=1)
+    stop_event = threading.Event()
+    grabber = threading.Thread(
+        target=grab_frames, args=(cap, latest_frame, stop_event), daemon=True
+    )
+    grabber.start()
+
     frame_count = 0
     start_time = time.time()
+    overlay_size = None
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        try:
+            frame = latest_frame.pop()
+        except IndexError:
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                break
+            continue
+        if frame is None:
             print("❌ Could not read frame")
             break
 
@@ -96,26 +218,13 @@ def preview_camera(camera_index):
             fps = frame_count / elapsed
             print(f"Actual FPS: {fps:.1f}")
 
-        # Add info overlay
+        # Add info overlay, re-rendered only if the frame size changes
         height, width = frame.shape[:2]
-        cv2.putText(
-            frame,
-            f"Camera {camera_index}: {width}x{height}",
-            (10, 30),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            1,
-            (0, 255, 0),
-            2,
-        )
-        cv2.putText(
-            frame,
-            "Press 'q' to quit, 's' for screenshot",
-            (10, height - 20),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.6,
-            (255, 255, 255),
-            2,
-        )
+        if (width, height) != overlay_size:
+            overlay_size = (width, height)
+            overlay = render_overlay(camera_index, width, height)
+        for y0, y1, pixels, mask in overlay:
+            np.copyto(frame[y0:y1], pixels, where=mask)
 
         cv2.imshow(f"Camera {camera_index} Preview", frame)
 
@@ -127,6 +236,8 @@ def preview_camera(camera_index):
             cv2.imwrite(filename, frame)
             print(f"📸 Screenshot saved: {filename}")
 
+    stop_event.set()
+    grabber.join()
     cap.release()
     cv2.destroyAllWindows()
 
@@ -136,8 +247,16 @@ def main():
     print("📱💻 Camera Selector for Object Tracking")
     print("=" * 50)
 
+    parser = argparse.ArgumentParser(description="Camera Selector")
+    parser.add_argument(
+        "--rescan",
+        action="store_true",
+        help="Ignore cached scan results and probe all camera indices",
+    )
+    args = parser.parse_args()
+
     # Find all cameras
-    cameras = find_all_cameras()
+    cameras = find_all_cameras(rescan=args.rescan)
 
     if not cameras:
         print("\n❌ No cameras found!")
@@ -1,2 +1,149 @@
 # config.py
 MODELS = {"yolo11n": "yolo11n.pt", "yolov8n": "yolov8n.pt"}
+
+# COCO class names, indexed by class id
+COCO_CLASSES = [
+    "person",
+    "bicycle",
+    "car",
+    "motorcycle",
+    "airplane",
+    "bus",
+    "train",
+    "truck",
+    "boat",
+    "traffic light",
+    "fire hydrant",
+    "stop sign",
+    "parking meter",
+    "bench",
+    "bird",
+    "cat",
+    "dog",
+    "horse",
+    "sheep",
+    "cow",
+    "elephant",
+    "bear",
+    "zebra",
+    "giraffe",
+    "backpack",
+    "umbrella",
+    "handbag",
+    "tie",
+    "suitcase",
+    "frisbee",
+    "skis",
+    "snowboard",
+    "sports ball",
+    "kite",
+    "baseball bat",
+    "baseball glove",
+    "skateboard",
+    "surfboard",
+    "tennis racket",
+    "bottle",
+    "wine glass",
+    "cup",
+    "fork",
+    "knife",
+    "spoon",
+    "bowl",
+    "banana",
+    "apple",
+    "sandwich",
+    "orange",
+    "broccoli",
+    "carrot",
+    "hot dog",
+    "pizza",
+    "donut",
+    "cake",
+    "chair",
+    "couch",
+    "potted plant",
+    "bed",
+    "dining table",
+    "toilet",
+    "tv",
+    "laptop",
+    "mouse",
+    "remote",
+    "keyboard",
+    "cell phone",
+    "microwave",
+    "oven",
+    "toaster",
+    "sink",
+    "refrigerator",
+    "book",
+    "clock",
+    "vase",
+    "scissors",
+    "teddy bear",
+    "hair drier",
+    "toothbrush",
+]
+
+# id -> name is the per-detection direction, so keep it as a plain tuple
+CLASS_NAMES = tuple(COCO_CLASSES)
+ID_TO_NAME = CLASS_NAMES
+
+# name -> id, used to resolve enabled class names to model class ids
+ENABLED_CLASSES = {name: idx for idx, name in enumerate(COCO_CLASSES)}
+
+# COCO class ids grouped by category
+OBJECT_CATEGORIES = {
+    "people": [0],
+    "vehicles": [1, 2, 3, 4, 5, 6, 7, 8],
+    "animals": [14, 15, 16, 17, 18, 19, 20, 21, 22, 23],
+    "accessories": [24, 25, 26, 27, 28],
+    "sports": [29, 30, 31, 32, 33, 34, 35, 36, 37, 38],
+    "kitchen": [39, 40, 41, 42, 43, 44, 45],
+    "food": [46, 47, 48, 49, 50, 51, 52, 53, 54, 55],
+    "electronics": [62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72],
+}
+
+# Every class not listed above falls into "other"
+all_categorized = set().union(*OBJECT_CATEGORIES.values())
+OBJECT_CATEGORIES["other"] = [i for i in range(80) if i not in all_categorized]
+
+# Category id lists are only used for membership tests
+OBJECT_CATEGORIES = {k: frozenset(v) for k, v in OBJECT_CATEGORIES.items()}
+
+# BGR drawing color per category
+CATEGORY_COLORS = {
+    "people": (0, 255, 0),
+    "vehicles": (255, 0, 0),
+    "animals": (0, 165, 255),
+    "accessories": (255, 0, 255),
+    "sports": (0, 255, 255),
+    "kitchen": (255, 255, 0),
+    "food": (0, 128, 255),
+    "electronics": (128, 0, 255),
+    "other": (200, 200, 200),
+}
+
+# Reverse lookup: class id -> category / color, so per-detection code can
+# index directly instead of scanning every category list
+CLASS_TO_CATEGORY = [None] * 80
+CLASS_TO_COLOR = [None] * 80
+for category, class_ids in OBJECT_CATEGORIES.items():
+    color = CATEGORY_COLORS[category]
+    for class_id in class_ids:
+        CLASS_TO_CATEGORY[class_id] = category
+        CLASS_TO_COLOR[class_id] = color
+
+
+def category_of(class_id):
+    """Category name for a class id; ids outside COCO count as "other"."""
+    if 0 <= class_id < len(CLASS_TO_CATEGORY):
+        return CLASS_TO_CATEGORY[class_id]
+    return "other"
+
+
+def color_of(class_id):
+    """BGR drawing color for a class id."""
+    if 0 <= class_id < len(CLASS_TO_COLOR):
+        return CLASS_TO_COLOR[class_id]
+    return CATEGORY_COLORS["other"]
@@ -1,20 +1,161 @@
 # detection.py
+import os
+from typing import NamedTuple
+
 import cv2
 import numpy as np
 from ultralytics import YOLO
 
+from config import MODELS, ENABLED_CLASSES, OBJECT_CATEGORIES, CLASS_TO_CATEGORY
+
+__all__ = ["FootballDetector", "OfflineDetector", "Detections", "CATEGORY_NAMES"]
+
+
+def _enabled_class_ids(enabled_classes):
+    """Resolve class names to sorted ids, or None to keep every class"""
+    if enabled_classes is None:
+        return None
+    return sorted(ENABLED_CLASSES[name] for name in enabled_classes)
+
+
+def _load_ncnn_model(model_path, imgsz):
+    """Load an FP16 NCNN export of the model, exporting it on first use
+
+    NCNN runs the model far faster than PyTorch on ARM CPUs. Falls back to
+    the PyTorch weights if the export fails.
+    """
+    ncnn_path = model_path.replace(".pt", "_ncnn_model")
+    if not os.path.isdir(ncnn_path):
+        try:
+            ncnn_path = YOLO(model_path).export(format="ncnn", half=True, imgsz=imgsz)
+        except Exception as e:
+            print(f"NCNN export failed, using PyTorch weights: {e}")
+            return YOLO(model_path)
+    return YOLO(ncnn_path, task="detect")
+
+
+class Detections(NamedTuple):
+    """Detections for one frame stored as parallel arrays"""
+
+    boxes: np.ndarray  # (N, 4) int32 x, y, w, h
+    confidences: np.ndarray  # (N,) float32
+    class_ids: np.ndarray  # (N,) int32
+    categories: np.ndarray  # (N,) int8 index into CATEGORY_NAMES
+
+
+CATEGORY_NAMES = tuple(OBJECT_CATEGORIES)
+
+# class id -> index into CATEGORY_NAMES, applied to a whole frame with np.take
+_CATEGORY_LUT = np.array(
+    [CATEGORY_NAMES.index(category) for category in CLASS_TO_CATEGORY], dtype=np.int8
+)
+
+
+def _results_to_arrays(results, confidence_threshold):
+    """Convert YOLO results into a Detections struct of arrays
+
+    Boxes are copied off the device once per result and filtered/converted
+    as arrays, without building any per-detection Python objects.
+    """
+    boxes, confs, class_ids = [], [], []
+    for result in results:
+        if result.boxes is None or len(result.boxes) == 0:
+            continue
+        boxes.append(result.boxes.xyxy.cpu().numpy())
+        confs.append(result.boxes.conf.cpu().numpy())
+        class_ids.append(result.boxes.cls.cpu().numpy().astype(np.int32))
+
+    if not boxes:
+        return Detections(
+            np.empty((0, 4), np.int32),
+            np.empty(0, np.float32),
+            np.empty(0, np.int32),
+            np.empty(0, np.int8),
+        )
+
+    xyxy = np.concatenate(boxes)
+    confs = np.concatenate(confs)
+    class_ids = np.concatenate(class_ids)
+
+    keep = confs >= confidence_threshold
+    xyxy, confs, class_ids = xyxy[keep], confs[keep], class_ids[keep]
+
+    xywh = xyxy.astype(np.int32)
+    xywh[:, 2:] -= xywh[:, :2]
+
+    categories = np.take(_CATEGORY_LUT, class_ids, mode="clip")
+    return Detections(xywh, confs, class_ids, categories)
+
+
+def _process_inference_results(results, confidence_threshold):
+    """Convert YOLO results into (x, y, w, h, conf, class_id) tuples"""
+    detections = _results_to_arrays(results, confidence_threshold)
+    return [
+        (x, y, w, h, conf, class_id)
+        for (x, y, w, h), conf, class_id in zip(
+            detections.boxes.tolist(),
+            detections.confidences.tolist(),
+            detections.class_ids.tolist(),
+        )
+    ]
+
+
 class FootballDetector:
-    def __init__(self):
-        self.model = YOLO('yolo11n.pt')
-    
-    def detect(self, frame):
-        results = self.model(frame)
-        return results
+    def __init__(
+        self,
+        model_name="yolo11n",
+        confidence_threshold=0.3,
+        enabled_classes=None,
+        imgsz=320,
+    ):
+        self.imgsz = imgsz
+        self.model = self._load_model(MODELS.get(model_name, "yolo11n.pt"))
+        self.confidence_threshold = confidence_threshold
+        self._enabled_ids = _enabled_class_ids(enabled_classes)
+
+    def _load_model(self, model_path):
+        # The export has a fixed input size, so inference is pinned to it
+        return _load_ncnn_model(model_path, self.imgsz)
 
-class OfflineDetector:
-    def __init__(self):
-        self.model = YOLO('yolo11n.pt')
-    
     def detect(self, frame):
-        results = self.model(frame)
-        return results
\ No newline at end of file
+        return _process_inference_results(
+            self._predict(frame), self.confidence_threshold
+        )
+
+    def detect_batch(self, frames):
+        """Detect objects in several frames with one batched model call"""
+        return [
+            _process_inference_results([result], self.confidence_threshold)
+            for result in self._predict(frames)
+        ]
+
+    def detect_arrays(self, frame):
+        """Detect objects and return them as a Detections struct of arrays"""
+        return _results_to_arrays(self._predict(frame), self.confidence_threshold)
+
+    def _predict(self, frame):
+        # Confidence and class filters run inside the model's NMS, so weak
+        # or disabled boxes are dropped before the IoU pass
+        return self.model(
+            frame,
+            imgsz=self.imgsz,
+            conf=self.confidence_threshold,
+            classes=self._enabled_ids,
+            verbose=False,
+        )
+
+
+class OfflineDetector(FootballDetector):
+    """Laptop/webcam detector running the PyTorch weights directly"""
+
+    def __init__(
+        self,
+        model_name="yolo11n",
+        confidence_threshold=0.3,
+        enabled_classes=None,
+        imgsz=640,
+    ):
+        super().__init__(model_name, confidence_threshold, enabled_classes, imgsz)
+
+    def _load_model(self, model_path):
+        return YOLO(model_path)
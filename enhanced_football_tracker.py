@@ -7,15 +7,72 @@ import cv2
 import numpy as np
 import time
 import json
+import logging
 from datetime import datetime
 import threading
 import queue
+from collections import deque
 from pathlib import Path
 
 # Import existing modules
 from detection import FootballDetector, OfflineDetector
 from tracking import MultiObjectTracker
-from config import MODELS, OBJECT_CATEGORIES
+from config import MODELS, OBJECT_CATEGORIES, CLASS_NAMES
+
+logger = logging.getLogger(__name__)
+
+# Event type ids, used with a track/goal index as event cooldown keys
+EVENT_GOAL, EVENT_FAST_MOVEMENT, EVENT_POSSESSION_CHANGE = range(3)
+
+# Cooldown entries older than this can no longer block an event
+COOLDOWN_EXPIRY = 10.0
+
+# Slots in the player position history; track ids share a slot modulo this
+MAX_TRACKS = 256
+
+# Initial capacity of the per-frame player box buffers (grown if exceeded)
+MAX_PLAYERS = 64
+
+
+def build_tracked_objects(tracker, detections):
+    """
+    Tracked-object dicts for the tracks seen in the tracker's latest update
+
+    Each track matched to (or registered from) a detection in that update
+    gets the detection's box, class and confidence.
+
+    Args:
+        tracker: MultiObjectTracker just updated with the detections' boxes
+        detections: (x, y, w, h, conf, class_id) tuples passed to the update
+
+    Returns:
+        list: Dicts with track_id, bbox, class_name and confidence
+    """
+    tracked_objects = []
+    for track_id, index in tracker.matched_rects.items():
+        x, y, w, h, conf, class_id = detections[index]
+        tracked_objects.append(
+            {
+                "track_id": track_id,
+                "bbox": (x, y, w, h),
+                "class_name": CLASS_NAMES[class_id],
+                "confidence": conf,
+            }
+        )
+    return tracked_objects
+
+
+def split_players_and_balls(tracked_objects):
+    """Split build_tracked_objects output into players and balls in one pass"""
+    players = []
+    balls = []
+    for obj in tracked_objects:
+        class_name = obj["class_name"]
+        if class_name == "person":
+            players.append(obj)
+        elif class_name == "sports ball":
+            balls.append(obj)
+    return players, balls
 
 
 class FootballTracker:
@@ -23,117 +80,371 @@ class FootballTracker:
     Enhanced football tracker for server integration
     """
 
-    def __init__(self, model_name="yolo11n", confidence_threshold=0.5, use_imx500=True):
+    def __init__(
+        self,
+        model_name="yolo11n",
+        confidence_threshold=0.5,
+        use_imx500=True,
+        pipelined=False,
+        detect_interval=1,
+        motion_threshold=4.0,
+    ):
         self.model_name = model_name
         self.confidence_threshold = confidence_threshold
         self.use_imx500 = use_imx500
 
         # Initialize detector
-        if use_imx500:
-            self.detector = FootballDetector(
-                model_name=model_name, confidence_threshold=confidence_threshold
-            )
-        else:
-            self.detector = OfflineDetector()
+        detector_class = FootballDetector if use_imx500 else OfflineDetector
+        self.detector = detector_class(
+            model_name=model_name, confidence_threshold=confidence_threshold
+        )
+        # Bound once so the per-frame paths skip the attribute lookups
+        self._detect = self.detector.detect
 
         # Initialize tracker
         self.tracker = MultiObjectTracker()
 
+        # Per-camera (tracker, event detector, stats) for process_frames,
+        # keyed by camera index
+        self.camera_state = {}
+
+        # Detection cadence: between detector runs the last result is
+        # repeated without touching the tracker or the detection stats,
+        # unless the scene moved more than motion_threshold (mean abs gray
+        # diff, 0-255) since the last run
+        self.detect_interval = detect_interval
+        self.motion_threshold = motion_threshold
+        self.last_result = None
+        self.last_detect_thumb = None
+
         # Tracking state
         self.frame_count = 0
         self.start_time = time.time()
-        self.fps_counter = 0
-        self.fps_start_time = time.time()
+        # FPS from an exponentially smoothed frame interval, in nanoseconds
+        self.last_frame_ns = None
+        self.frame_interval_ns = None
         self.current_fps = 0
 
         # Event detection
         self.event_detector = FootballEventDetector()
 
         # Statistics
-        self.stats = {
-            "total_frames": 0,
-            "total_detections": 0,
-            "player_count": 0,
-            "ball_detections": 0,
-            "events": [],
-        }
+        self.stats_lock = threading.Lock()
+        self.stats = self._new_stats()
+
+        # Pipelined mode: detection and tracking run on their own threads,
+        # linked by one-slot queues that keep only the newest item
+        self.pipelined = pipelined
+        if pipelined:
+            self.detect_queue = queue.Queue(maxsize=1)
+            self.track_queue = queue.Queue(maxsize=1)
+            self.result_queue = queue.Queue(maxsize=1)
+            self.stop_event = threading.Event()
+            self.workers = []
+            self.start()
 
     def process_frame(self, frame):
         """
         Process a single frame and return detection/tracking results
 
+        In pipelined mode the frame is handed to the detection thread
+        without waiting (replacing any frame it has not started yet), and
+        the call returns the newest result finished since the last call.
+
         Args:
             frame: Input frame (numpy array)
 
         Returns:
-            dict: Detection and tracking results
+            dict: Detection and tracking results, or None in pipelined mode
+            when no new result is ready. "stats" is the tracker's live
+            statistics dict and must not be modified; use snapshot_stats()
+            for a copy that later frames won't change.
+
+        Raises:
+            Exception: In pipelined mode, an error raised by the detection
+            or tracking thread, re-raised on the next call after it happened
+        """
+        self.frame_count += 1
+        current_time = time.time()
+
+        if not self.pipelined:
+            if self._should_detect(frame):
+                self.last_result = self._track(
+                    frame, self._detect(frame), self.frame_count, current_time
+                )
+                return self.last_result
+            return self._repeat_last_result(self.frame_count, current_time)
+
+        self._put_latest(self.detect_queue, (frame, self.frame_count, current_time))
+        try:
+            result = self.result_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+        # A worker failed on an earlier frame; surface it to the caller
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _should_detect(self, frame):
+        """Decide whether this frame needs a fresh detector pass"""
+        if self.detect_interval <= 1:
+            return True
+
+        # Downscale first so the color conversion only touches 64x36 pixels
+        thumb = cv2.cvtColor(
+            cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY,
+        )
+        if (
+            self.last_result is None
+            or self.frame_count % self.detect_interval == 0
+            or cv2.mean(cv2.absdiff(thumb, self.last_detect_thumb))[0]
+            > self.motion_threshold
+        ):
+            self.last_detect_thumb = thumb
+            return True
+        return False
+
+    def _repeat_last_result(self, frame_number, timestamp):
+        """Result for a frame skipped by the detection cadence
+
+        Repeats the last detections and tracked objects without feeding them
+        to the tracker again, so tracks aren't pinned to stale positions and
+        the detection totals only count detector output. No events are
+        raised for a frame nothing new was seen in.
+        """
+        with self.stats_lock:
+            self.stats["total_frames"] = self.frame_count
+        self._update_fps()
+
+        return {
+            **self.last_result,
+            "frame_number": frame_number,
+            "timestamp": timestamp,
+            "fps": self.current_fps,
+            "events": [],
+            "stats": self.stats,
+        }
+
+    def process_frames(self, frames):
+        """
+        Process one frame from each of several cameras in a single batch
+
+        All frames go through one batched detector call; tracking, event
+        detection and statistics then run per camera with their own state.
+        Each result's "stats" are that camera's, not the tracker's stats.
+
+        Args:
+            frames: List of frames, one per camera, indexed consistently
+                across calls
+
+        Returns:
+            list: Detection and tracking results per camera, in input order
         """
         self.frame_count += 1
         current_time = time.time()
 
-        # Run detection
-        detections = self.detector.detect(frame)
+        batch_detections = self.detector.detect_batch(frames)
+
+        results = []
+        for camera_index, (frame, detections) in enumerate(
+            zip(frames, batch_detections)
+        ):
+            if camera_index not in self.camera_state:
+                self.camera_state[camera_index] = (
+                    MultiObjectTracker(),
+                    FootballEventDetector(),
+                    self._new_stats(),
+                )
+            tracker, event_detector, stats = self.camera_state[camera_index]
+            results.append(
+                self._track(
+                    frame,
+                    detections,
+                    self.frame_count,
+                    current_time,
+                    tracker,
+                    event_detector,
+                    stats,
+                )
+            )
+        return results
+
+    def _track(
+        self,
+        frame,
+        detections,
+        frame_number,
+        timestamp,
+        tracker=None,
+        event_detector=None,
+        stats=None,
+    ):
+        """Run tracking, event detection and statistics for one detected frame"""
+        if tracker is None:
+            tracker = self.tracker
+        if event_detector is None:
+            event_detector = self.event_detector
+        if stats is None:
+            stats = self.stats
+
+        # Update tracker with the boxes, then attach each track's detection
+        tracker.update([detection[:4] for detection in detections])
+        tracked_objects = build_tracked_objects(tracker, detections)
 
-        # Update tracker
-        tracked_objects = self.tracker.update(detections)
+        # Classify once for both event detection and statistics
+        players, balls = split_players_and_balls(tracked_objects)
 
         # Detect events
-        events = self.event_detector.detect_events(tracked_objects, frame)
+        events = event_detector.detect_events(tracked_objects, frame, players, balls)
 
         # Update statistics
-        self.update_stats(detections, tracked_objects, events)
+        with self.stats_lock:
+            self.update_stats(detections, players, balls, events, stats)
 
-        # Calculate FPS
-        self.fps_counter += 1
-        if current_time - self.fps_start_time >= 1.0:
-            self.current_fps = self.fps_counter / (current_time - self.fps_start_time)
-            self.fps_counter = 0
-            self.fps_start_time = current_time
+        self._update_fps()
 
         return {
-            "frame_number": self.frame_count,
-            "timestamp": current_time,
+            "frame_number": frame_number,
+            "timestamp": timestamp,
             "fps": self.current_fps,
             "detections": detections,
             "tracked_objects": tracked_objects,
             "events": events,
-            "stats": self.stats.copy(),
+            "stats": stats,
         }
 
-    def update_stats(self, detections, tracked_objects, events):
-        """Update tracking statistics"""
-        self.stats["total_frames"] = self.frame_count
-        self.stats["total_detections"] += len(detections)
+    def _update_fps(self):
+        """Fold the time since the previous frame into the FPS estimate"""
+        # Smoothing the interval rather than its inverse keeps back-to-back
+        # frames (e.g. a process_frames batch) from spiking it
+        now_ns = time.monotonic_ns()
+        if self.last_frame_ns is not None:
+            interval_ns = now_ns - self.last_frame_ns
+            if self.frame_interval_ns is None:
+                self.frame_interval_ns = interval_ns
+            else:
+                self.frame_interval_ns += 0.1 * (interval_ns - self.frame_interval_ns)
+            if self.frame_interval_ns > 0:
+                self.current_fps = 1e9 / self.frame_interval_ns
+        self.last_frame_ns = now_ns
+
+    def _detect_worker(self):
+        """Detection stage of the pipeline"""
+        while not self.stop_event.is_set():
+            try:
+                frame, frame_number, timestamp = self.detect_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                detections = self._detect(frame)
+            except Exception as e:
+                logger.exception("Detection failed on frame %d", frame_number)
+                self._put_latest(self.result_queue, e)
+                continue
+            self._put_latest(
+                self.track_queue, (frame, detections, frame_number, timestamp)
+            )
 
-        # Count players and balls
-        players = [obj for obj in tracked_objects if obj.get("class_name") == "person"]
-        balls = [
-            obj for obj in tracked_objects if obj.get("class_name") == "sports ball"
+    def _track_worker(self):
+        """Tracking and event stage of the pipeline"""
+        while not self.stop_event.is_set():
+            try:
+                item = self.track_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                result = self._track(*item)
+            except Exception as e:
+                logger.exception("Tracking failed on frame %d", item[2])
+                result = e
+            self._put_latest(self.result_queue, result)
+
+    @staticmethod
+    def _put_latest(q, item):
+        """Put an item on a one-slot queue, dropping a stale unread item"""
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            q.put_nowait(item)
+
+    def start(self):
+        """Start the pipeline threads; a no-op if running or not pipelined"""
+        if not self.pipelined or self.workers:
+            return
+        self.stop_event.clear()
+        self.workers = [
+            threading.Thread(target=self._detect_worker, daemon=True),
+            threading.Thread(target=self._track_worker, daemon=True),
         ]
+        for worker in self.workers:
+            worker.start()
 
-        self.stats["player_count"] = len(players)
-        self.stats["ball_detections"] += len(balls)
-
-        # Add events
-        self.stats["events"].extend(events)
+    def close(self):
+        """Stop the pipeline threads and drop any frames or results in flight
 
-        # Keep only recent events (last 100)
-        if len(self.stats["events"]) > 100:
-            self.stats["events"] = self.stats["events"][-100:]
-
-    def reset(self):
-        """Reset tracker state"""
-        self.tracker.reset()
-        self.frame_count = 0
-        self.start_time = time.time()
-        self.stats = {
+        The tracker can be restarted with start().
+        """
+        if not self.pipelined or not self.workers:
+            return
+        self.stop_event.set()
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+        for q in (self.detect_queue, self.track_queue, self.result_queue):
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+    def snapshot_stats(self):
+        """Return a copy of the statistics that later frames won't modify"""
+        with self.stats_lock:
+            stats = self.stats.copy()
+            stats["events"] = list(stats["events"])
+        return stats
+
+    @staticmethod
+    def _new_stats():
+        """Empty tracking statistics"""
+        return {
             "total_frames": 0,
             "total_detections": 0,
             "player_count": 0,
             "ball_detections": 0,
-            "events": [],
+            "events": deque(maxlen=100),  # Keep only recent events
         }
 
+    def update_stats(self, detections, players, balls, events, stats=None):
+        """Update tracking statistics (the tracker's own unless given)"""
+        if stats is None:
+            stats = self.stats
+        stats["total_frames"] = self.frame_count
+        stats["total_detections"] += len(detections)
+
+        # Count players and balls
+        stats["player_count"] = len(players)
+        stats["ball_detections"] += len(balls)
+
+        # Add events, dropping the oldest beyond the last 100
+        stats["events"].extend(events)
+
+    def reset(self):
+        """Reset tracker state, including every camera's process_frames state"""
+        self.tracker = MultiObjectTracker()
+        self.event_detector = FootballEventDetector()
+        self.camera_state.clear()
+        self.frame_count = 0
+        self.last_result = None
+        self.start_time = time.time()
+        with self.stats_lock:
+            self.stats = self._new_stats()
+
 
 class FootballEventDetector:
     """
@@ -141,10 +452,28 @@ class FootballEventDetector:
     """
 
     def __init__(self):
-        self.previous_positions = {}
-        self.event_cooldown = {}  # Prevent duplicate events
+        # Last center, time.monotonic() and owning track id per history slot,
+        # as parallel arrays so all players' speeds come from one expression
+        self.prev_xy = np.zeros((MAX_TRACKS, 2), dtype=np.float32)
+        self.prev_t = np.zeros(MAX_TRACKS, dtype=np.float64)
+        self.prev_id = np.full(MAX_TRACKS, -1, dtype=np.int64)
+
+        # Player boxes and centers, overwritten every frame
+        self.player_boxes = np.empty((MAX_PLAYERS, 4), dtype=np.float32)
+        self.player_xy = np.empty((MAX_PLAYERS, 2), dtype=np.float32)
+        # (event type, id) -> time.monotonic() of the last event, to prevent
+        # duplicate events
+        self.event_cooldown = {}
+        self.last_cooldown_sweep = time.monotonic()
         self.goal_areas = self.define_goal_areas()
 
+        # Goal rectangles as a (G, 4) x1, y1, x2, y2 array for one-shot tests
+        self.goal_names = list(self.goal_areas)
+        self.goal_boxes = np.array(
+            [[a["x1"], a["y1"], a["x2"], a["y2"]] for a in self.goal_areas.values()],
+            dtype=np.float32,
+        )
+
     def define_goal_areas(self):
         """Define goal areas (will be calibrated based on field detection)"""
         # These would be dynamically calculated based on field detection
@@ -153,170 +482,174 @@ class FootballEventDetector:
             "right_goal": {"x1": 540, "y1": 200, "x2": 640, "y2": 400},
         }
 
-    def detect_events(self, tracked_objects, frame):
+    def detect_events(self, tracked_objects, frame, players=None, balls=None):
         """
         Detect football events from tracked objects
 
         Args:
-            tracked_objects: List of tracked objects
+            tracked_objects: Tracked-object dicts from build_tracked_objects
             frame: Current frame
+            players, balls: tracked_objects already split by
+                split_players_and_balls, to skip classifying them again
 
         Returns:
             list: Detected events
         """
         events = []
         current_time = time.time()
+        self.evict_stale_cooldowns()
 
         # Find ball and players
-        ball = None
-        players = []
-
-        for obj in tracked_objects:
-            if obj.get("class_name") == "sports ball":
-                ball = obj
-            elif obj.get("class_name") == "person":
-                players.append(obj)
+        if players is None or balls is None:
+            players, balls = split_players_and_balls(tracked_objects)
+        ball = balls[-1] if balls else None
 
-        # Goal detection
+        # Goal detection; the ball's box is read once for every check
         if ball:
-            goal_event = self.detect_goal(ball, current_time)
+            ball_box = ball["bbox"]
+            goal_event = self.detect_goal(ball_box, current_time)
             if goal_event:
                 events.append(goal_event)
 
+        players_xy = self.player_centers(players)
+
         # Fast movement detection (potential highlight moments)
-        for player in players:
-            speed_event = self.detect_fast_movement(player, current_time)
-            if speed_event:
-                events.append(speed_event)
+        events.extend(self.detect_fast_movement(players, players_xy, current_time))
 
         # Ball possession changes
         if ball and players:
             possession_event = self.detect_possession_change(
-                ball, players, current_time
+                ball_box, players, players_xy, current_time
             )
             if possession_event:
                 events.append(possession_event)
 
         return events
 
-    def detect_goal(self, ball, current_time):
-        """Detect if ball enters goal area"""
-        ball_x = ball.get("bbox", [0, 0, 0, 0])[0]
-        ball_y = ball.get("bbox", [0, 0, 0, 0])[1]
-
-        # Check if ball is in goal area
-        for goal_name, goal_area in self.goal_areas.items():
-            if (
-                goal_area["x1"] <= ball_x <= goal_area["x2"]
-                and goal_area["y1"] <= ball_y <= goal_area["y2"]
-            ):
-
-                # Check cooldown to prevent duplicate events
-                cooldown_key = f"goal_{goal_name}"
-                if (
-                    cooldown_key not in self.event_cooldown
-                    or current_time - self.event_cooldown[cooldown_key] > 5.0
-                ):
+    def cooldown_ready(self, key, period):
+        """Return True and restart the cooldown if key's cooldown has expired"""
+        now = time.monotonic()
+        last = self.event_cooldown.get(key)
+        if last is not None and now - last <= period:
+            return False
+        self.event_cooldown[key] = now
+        return True
+
+    def evict_stale_cooldowns(self):
+        """Drop expired cooldowns so tracks that left the frame don't pile up"""
+        now = time.monotonic()
+        if now - self.last_cooldown_sweep < COOLDOWN_EXPIRY:
+            return
+        self.last_cooldown_sweep = now
+        self.event_cooldown = {
+            key: last
+            for key, last in self.event_cooldown.items()
+            if now - last <= COOLDOWN_EXPIRY
+        }
 
-                    self.event_cooldown[cooldown_key] = current_time
+    def player_centers(self, players):
+        """Centers of the players' boxes as an (N, 2) view of a reused buffer
 
-                    return {
-                        "type": "goal",
-                        "timestamp": current_time,
-                        "location": goal_name,
-                        "confidence": 0.8,
-                        "description": f"Potential goal detected at {goal_name}",
-                    }
+        The view is only valid until the next call.
+        """
+        num_players = len(players)
+        if num_players > len(self.player_boxes):
+            self.player_boxes = np.empty((num_players, 4), dtype=np.float32)
+            self.player_xy = np.empty((num_players, 2), dtype=np.float32)
+
+        boxes = self.player_boxes[:num_players]
+        centers = self.player_xy[:num_players]
+        if num_players:
+            boxes[:] = [player["bbox"] for player in players]
+            np.multiply(boxes[:, 2:], 0.5, out=centers)
+            centers += boxes[:, :2]
+        return centers
+
+    def detect_goal(self, ball_box, current_time):
+        """Detect if ball enters goal area"""
+        ball_x, ball_y = ball_box[:2]
+
+        # Check every goal area at once
+        goals = self.goal_boxes
+        inside = np.flatnonzero(
+            (goals[:, 0] <= ball_x)
+            & (ball_x <= goals[:, 2])
+            & (goals[:, 1] <= ball_y)
+            & (ball_y <= goals[:, 3])
+        )
+
+        for goal_index in inside:
+            goal_name = self.goal_names[goal_index]
+
+            # Check cooldown to prevent duplicate events
+            if self.cooldown_ready((EVENT_GOAL, int(goal_index)), 5.0):
+                return {
+                    "type": "goal",
+                    "timestamp": current_time,
+                    "location": goal_name,
+                    "confidence": 0.8,
+                    "description": f"Potential goal detected at {goal_name}",
+                }
 
         return None
 
-    def detect_fast_movement(self, player, current_time):
+    def detect_fast_movement(self, players, players_xy, current_time):
         """Detect fast player movement (sprints, tackles)"""
-        player_id = player.get("track_id")
-        if not player_id:
-            return None
-
-        current_pos = player.get("bbox", [0, 0, 0, 0])
-        current_center = (
-            current_pos[0] + current_pos[2] / 2,
-            current_pos[1] + current_pos[3] / 2,
-        )
-
-        if player_id in self.previous_positions:
-            prev_pos, prev_time = self.previous_positions[player_id]
-
-            # Calculate speed
-            distance = np.sqrt(
-                (current_center[0] - prev_pos[0]) ** 2
-                + (current_center[1] - prev_pos[1]) ** 2
-            )
-            time_diff = current_time - prev_time
-
-            if time_diff > 0:
-                speed = distance / time_diff
-
-                # Threshold for fast movement (adjust based on field size)
-                if speed > 50:  # pixels per second
-                    cooldown_key = f"fast_movement_{player_id}"
-                    if (
-                        cooldown_key not in self.event_cooldown
-                        or current_time - self.event_cooldown[cooldown_key] > 3.0
-                    ):
-
-                        self.event_cooldown[cooldown_key] = current_time
-
-                        return {
-                            "type": "fast_movement",
-                            "timestamp": current_time,
-                            "player_id": player_id,
-                            "speed": speed,
-                            "confidence": min(speed / 100, 1.0),
-                            "description": f"Fast movement detected for player {player_id}",
-                        }
+        ids = np.array([player["track_id"] for player in players], dtype=np.int64)
+        xy = players_xy
+        slots = ids % MAX_TRACKS
+        now = time.monotonic()
+
+        # Calculate speed for every player seen in the previous update
+        time_diff = now - self.prev_t[slots]
+        moving = (self.prev_id[slots] == ids) & (time_diff > 0)
+        speeds = np.zeros(len(ids))
+        distance = np.hypot(*(xy[moving] - self.prev_xy[slots[moving]]).T)
+        speeds[moving] = distance / time_diff[moving]
 
         # Update position history
-        self.previous_positions[player_id] = (current_center, current_time)
+        self.prev_xy[slots] = xy
+        self.prev_t[slots] = now
+        self.prev_id[slots] = ids
 
-        return None
+        events = []
+        # Threshold for fast movement (adjust based on field size)
+        for i in np.flatnonzero(speeds > 50):  # pixels per second
+            player_id = int(ids[i])
+            speed = float(speeds[i])
+            if self.cooldown_ready((EVENT_FAST_MOVEMENT, player_id), 3.0):
+                events.append(
+                    {
+                        "type": "fast_movement",
+                        "timestamp": current_time,
+                        "player_id": player_id,
+                        "speed": speed,
+                        "confidence": min(speed / 100, 1.0),
+                        "description": f"Fast movement detected for player {player_id}",
+                    }
+                )
+
+        return events
 
-    def detect_possession_change(self, ball, players, current_time):
+    def detect_possession_change(self, ball_box, players, players_xy, current_time):
         """Detect ball possession changes"""
         # Find closest player to ball
-        ball_center = ball.get("bbox", [0, 0, 0, 0])
-        ball_pos = (
-            ball_center[0] + ball_center[2] / 2,
-            ball_center[1] + ball_center[3] / 2,
+        x, y, w, h = ball_box
+        distances = np.hypot(
+            players_xy[:, 0] - (x + w / 2), players_xy[:, 1] - (y + h / 2)
         )
-
-        closest_player = None
-        min_distance = float("inf")
-
-        for player in players:
-            player_center = player.get("bbox", [0, 0, 0, 0])
-            player_pos = (
-                player_center[0] + player_center[2] / 2,
-                player_center[1] + player_center[3] / 2,
-            )
-
-            distance = np.sqrt(
-                (ball_pos[0] - player_pos[0]) ** 2 + (ball_pos[1] - player_pos[1]) ** 2
-            )
-
-            if distance < min_distance:
-                min_distance = distance
-                closest_player = player
+        closest = int(np.argmin(distances))
+        closest_player = players[closest]
+        min_distance = distances[closest]
 
         # Check if possession changed
         if closest_player and min_distance < 50:  # Within 50 pixels
-            player_id = closest_player.get("track_id")
+            player_id = closest_player["track_id"]
 
             if hasattr(self, "current_possession"):
-                if (
-                    self.current_possession != player_id
-                    and current_time - getattr(self, "last_possession_change", 0) > 2.0
+                if self.current_possession != player_id and self.cooldown_ready(
+                    (EVENT_POSSESSION_CHANGE, 0), 2.0
                 ):
-
-                    self.last_possession_change = current_time
                     old_possession = self.current_possession
                     self.current_possession = player_id
 
@@ -381,76 +714,83 @@ class HighlightGenerator:
         return highlights
 
     def score_segments(self, tracking_data, segment_duration=5):
-        """Score time segments based on activity and events"""
+        """Score time segments based on activity and events
+
+        tracking_data must be in timestamp order, so each segment is a
+        contiguous slice found with a binary search.
+        """
         segments = []
 
         if not tracking_data:
             return segments
 
-        start_time = tracking_data[0]["timestamp"]
-        end_time = tracking_data[-1]["timestamp"]
-
-        current_time = start_time
-        while current_time < end_time:
-            segment_end = min(current_time + segment_duration, end_time)
-
-            # Get data for this segment
-            segment_data = [
-                data
-                for data in tracking_data
-                if current_time <= data["timestamp"] < segment_end
-            ]
+        timestamps, event_scores, object_counts, has_ball = self.frame_activity(
+            tracking_data
+        )
+        start_time = timestamps[0]
+        end_time = timestamps[-1]
+        if start_time >= end_time:
+            return segments
 
-            # Calculate score
-            score = self.calculate_segment_score(segment_data)
+        # Segment boundaries, with the last segment cut short at end_time
+        num_segments = int(np.ceil((end_time - start_time) / segment_duration))
+        starts = start_time + segment_duration * np.arange(num_segments)
+        ends = np.minimum(starts + segment_duration, end_time)
+        lo = np.searchsorted(timestamps, starts, side="left")
+        hi = np.searchsorted(timestamps, ends, side="left")
+
+        # Per-segment sums as differences of running totals
+        def segment_sums(values):
+            totals = np.concatenate(([0.0], np.cumsum(values)))
+            return totals[hi] - totals[lo]
+
+        counts = hi - lo
+        scores = (
+            segment_sums(event_scores)
+            # More players = more activity
+            + segment_sums(object_counts) / np.maximum(counts, 1) * 0.1
+            + segment_sums(has_ball) * 0.2
+        )
 
+        for start, end, first, last, score in zip(
+            starts.tolist(), ends.tolist(), lo.tolist(), hi.tolist(), scores.tolist()
+        ):
             segments.append(
                 {
-                    "start_time": current_time,
-                    "end_time": segment_end,
+                    "start_time": start,
+                    "end_time": end,
                     "score": score,
-                    "data": segment_data,
+                    "data": tracking_data[first:last],
                 }
             )
 
-            current_time = segment_end
-
         return segments
 
-    def calculate_segment_score(self, segment_data):
-        """Calculate score for a time segment"""
-        if not segment_data:
-            return 0
+    def frame_activity(self, tracking_data):
+        """Per-frame timestamp, event score, object count and ball flag arrays"""
+        num_frames = len(tracking_data)
+        timestamps = np.empty(num_frames, dtype=np.float64)
+        event_scores = np.zeros(num_frames, dtype=np.float64)
+        object_counts = np.empty(num_frames, dtype=np.float64)
+        has_ball = np.zeros(num_frames, dtype=np.float64)
 
-        score = 0
+        for i, data in enumerate(tracking_data):
+            timestamps[i] = data["timestamp"]
 
-        # Event-based scoring
-        for data in segment_data:
-            events = data.get("events", [])
-            for event in events:
+            # Event-based scoring
+            for event in data.get("events", []):
                 event_type = event.get("type", "")
                 weight = self.event_weights.get(event_type, 0.1)
-                confidence = event.get("confidence", 0.5)
-                score += weight * confidence
+                event_scores[i] += weight * event.get("confidence", 0.5)
 
-        # Activity-based scoring
-        avg_players = np.mean(
-            [len(data.get("tracked_objects", [])) for data in segment_data]
-        )
-        score += avg_players * 0.1  # More players = more activity
-
-        # Ball activity
-        ball_detections = sum(
-            1
-            for data in segment_data
-            if any(
-                obj.get("class_name") == "sports ball"
-                for obj in data.get("tracked_objects", [])
+            # Activity-based scoring
+            tracked_objects = data.get("tracked_objects", [])
+            object_counts[i] = len(tracked_objects)
+            has_ball[i] = any(
+                obj.get("class_name") == "sports ball" for obj in tracked_objects
             )
-        )
-        score += ball_detections * 0.2
 
-        return score
+        return timestamps, event_scores, object_counts, has_ball
 
     def find_peak_moments(self, segments, min_duration):
         """Find peak moments for highlights"""
@@ -459,41 +799,36 @@ class HighlightGenerator:
 
         highlights = []
 
-        # Find local maxima
-        for i, segment in enumerate(segments):
-            if segment["score"] > 0.5:  # Minimum threshold
-                # Check if it's a local maximum
-                is_peak = True
-
-                # Check previous segments
-                for j in range(max(0, i - 2), i):
-                    if segments[j]["score"] >= segment["score"]:
-                        is_peak = False
-                        break
-
-                # Check next segments
-                for j in range(i + 1, min(len(segments), i + 3)):
-                    if segments[j]["score"] >= segment["score"]:
-                        is_peak = False
-                        break
-
-                if is_peak:
-                    # Extend highlight to include surrounding activity
-                    start_idx = max(0, i - 1)
-                    end_idx = min(len(segments) - 1, i + 1)
-
-                    highlight_start = segments[start_idx]["start_time"]
-                    highlight_end = segments[end_idx]["end_time"]
-
-                    if highlight_end - highlight_start >= min_duration:
-                        highlights.append(
-                            {
-                                "start_time": highlight_start,
-                                "end_time": highlight_end,
-                                "score": segment["score"],
-                                "peak_segment": segment,
-                            }
-                        )
+        # Find local maxima: strictly above the two segments on either side
+        # (missing neighbors past the ends never block a peak) and above the
+        # minimum threshold
+        scores = np.fromiter(
+            (segment["score"] for segment in segments),
+            dtype=np.float64,
+            count=len(segments),
+        )
+        padded = np.pad(scores, 2, constant_values=-np.inf)
+        is_peak = scores > 0.5
+        for offset in (0, 1, 3, 4):
+            is_peak &= scores > padded[offset : offset + len(scores)]
+
+        for i in np.flatnonzero(is_peak).tolist():
+            # Extend highlight to include surrounding activity
+            start_idx = max(0, i - 1)
+            end_idx = min(len(segments) - 1, i + 1)
+
+            highlight_start = segments[start_idx]["start_time"]
+            highlight_end = segments[end_idx]["end_time"]
+
+            if highlight_end - highlight_start >= min_duration:
+                highlights.append(
+                    {
+                        "start_time": highlight_start,
+                        "end_time": highlight_end,
+                        "score": segments[i]["score"],
+                        "peak_segment": segments[i],
+                    }
+                )
 
         return highlights
 
@@ -7,13 +7,16 @@ import cv2
 import argparse
 import time
 import os
+import threading
+from collections import deque
 from datetime import datetime
 import numpy as np
 
 # Import our modules
 from detection import FootballDetector, OfflineDetector
 from tracking import MultiObjectTracker
-from config import MODELS
+from config import MODELS, category_of, color_of
+from camera_selector import grab_frames
 
 
 class FootballTrackerApp:
@@ -33,9 +36,12 @@ class FootballTrackerApp:
         self.tracker = MultiObjectTracker()
         self.writer = None
 
-        # Camera
+        # Camera, read on a background thread into a one-frame slot
         self.cap = None
         self.running = False
+        self.latest_frame = deque(maxlen=1)
+        self.stop_event = threading.Event()
+        self.grabber = None
 
         # Recording
         self.recording = record is not None
@@ -53,6 +59,7 @@ class FootballTrackerApp:
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
             self.cap.set(cv2.CAP_PROP_FPS, 30)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
             print("✅ Camera initialized successfully")
             return True
@@ -94,17 +101,21 @@ class FootballTrackerApp:
             return False
 
     def draw_detections(self, frame, detections):
-        """Draw detection boxes and labels"""
-        for detection in detections:
-            x, y, w, h, conf, class_id = detection
+        """Draw detection boxes and labels from a Detections struct of arrays"""
+        for (x, y, w, h), conf, class_id in zip(
+            detections.boxes.tolist(),
+            detections.confidences.tolist(),
+            detections.class_ids.tolist(),
+        ):
+            color = color_of(class_id)
 
             # Draw bounding box
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
 
             # Draw label
-            label = f"Object {class_id}: {conf:.2f}"
+            label = f"{category_of(class_id)} {class_id}: {conf:.2f}"
             cv2.putText(
-                frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2
+                frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2
             )
 
         return frame
@@ -150,25 +161,33 @@ class FootballTrackerApp:
 
         print("🎬 Starting tracking... Press 'q' to quit")
 
+        # Capture runs independently of inference so detection always
+        # sees the newest frame instead of one queued behind it
+        self.grabber = threading.Thread(
+            target=grab_frames,
+            args=(self.cap, self.latest_frame, self.stop_event),
+            daemon=True,
+        )
+        self.grabber.start()
+
         try:
             while self.running:
-                ret, frame = self.cap.read()
-                if not ret:
+                try:
+                    frame = self.latest_frame.pop()
+                except IndexError:
+                    time.sleep(0.001)
+                    continue
+                if frame is None:
                     print("❌ Failed to read frame")
                     break
 
                 frame_count += 1
 
                 # Run detection
-                detections = self.detector.detect(frame)
+                detections = self.detector.detect_arrays(frame)
 
-                # Convert detections to rectangles for tracking
-                rects = []
-                for detection in detections:
-                    if len(detection) >= 6:  # Check if detection has enough values
-                        x, y, w, h, conf, class_id = detection
-                        if conf >= self.confidence:
-                            rects.append((x, y, w, h))
+                # Confident boxes go to the tracker as one (N, 4) array
+                rects = detections.boxes[detections.confidences >= self.confidence]
 
                 # Update tracking
                 tracked_objects = self.tracker.update(rects)
@@ -220,6 +239,10 @@ class FootballTrackerApp:
         """Clean up resources"""
         self.running = False
 
+        self.stop_event.set()
+        if self.grabber:
+            self.grabber.join()
+
         if self.writer:
             self.writer.release()
             print(f"✅ Video saved: {self.record_path}")
@@ -4,15 +4,17 @@ Runs on each Raspberry Pi to control camera and communicate with main server
 """
 
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 import threading
 import time
 import os
 import cv2
 import numpy as np
-from picamera2 import Picamera2
+from picamera2 import Picamera2, MappedArray
 from picamera2.encoders import H264Encoder
 from picamera2.outputs import FileOutput
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 import subprocess
@@ -20,11 +22,31 @@ import signal
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import your existing tracking modules
-from football_tracker import FootballTracker
+from enhanced_football_tracker import FootballTracker
 from config import MODELS
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Serialize Flask responses with orjson, which also handles numpy values"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 
 
 class CameraServer:
@@ -42,6 +64,11 @@ class CameraServer:
         )
         self.camera_id = os.environ.get("CAMERA_ID", "default")
 
+        # Reuse TCP/TLS connections to the main server across requests
+        self.http = requests.Session()
+        self.http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        self.http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
         # Initialize camera
         self.init_camera()
 
@@ -65,6 +92,7 @@ class CameraServer:
                 model_name="yolo11n",  # Use the fastest model for real-time
                 confidence_threshold=0.5,
                 use_imx500=True,
+                pipelined=True,  # Detect/track on worker threads, keep newest frame
             )
 
             print("Camera initialized successfully")
@@ -76,7 +104,7 @@ class CameraServer:
     def register_with_server(self):
         """Register this camera with the main server"""
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.main_server_url}/api/camera/register",
                 json={
                     "camera_id": self.camera_id,
@@ -141,6 +169,8 @@ class CameraServer:
             self.recording_path = output_path
             self.recording = True
 
+            # The pipeline threads are stopped between recordings
+            self.tracker.start()
             self.tracking_thread = threading.Thread(target=self.run_tracking)
             self.tracking_thread.daemon = True
             self.tracking_thread.start()
@@ -171,9 +201,12 @@ class CameraServer:
                 self.picam2.stop_encoder()
                 self.picam2.stop()
 
-            # Wait for tracking thread to finish
+            # Wait for tracking thread to finish, then stop the tracker's
+            # pipeline threads until the next recording
             if self.tracking_thread:
                 self.tracking_thread.join(timeout=5)
+            if self.tracker:
+                self.tracker.close()
 
             recording_path = self.recording_path
             session_id = self.current_session_id
@@ -199,6 +232,20 @@ class CameraServer:
         except Exception as e:
             return {"error": f"Failed to stop recording: {str(e)}"}
 
+    def capture_lores_bgr(self):
+        """Capture the lores stream as a BGR frame for the YOLO detector
+
+        The camera buffer is mapped rather than copied with capture_array,
+        and the YUV420 planes are converted straight out of it before the
+        request is released.
+        """
+        with self.picam2.captured_request() as request:
+            with MappedArray(request, "lores") as mapped:
+                # YUV420 arrives as a single 2-D buffer of height * 3/2 rows
+                if mapped.array.ndim == 2:
+                    return cv2.cvtColor(mapped.array, cv2.COLOR_YUV2BGR_I420)
+                return mapped.array.copy()
+
     def run_tracking(self):
         """Run AI tracking while recording"""
         try:
@@ -207,18 +254,21 @@ class CameraServer:
 
             while self.recording and self.picam2:
                 # Capture frame for AI processing
-                frame = self.picam2.capture_array("lores")
-
-                if frame is not None:
-                    # Convert YUV to RGB for processing
-                    if len(frame.shape) == 3 and frame.shape[2] == 1:
-                        # Convert YUV420 to RGB
-                        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_YUV2RGB_I420)
-                    else:
-                        frame_rgb = frame
-
-                    # Run AI detection and tracking
-                    detections = self.tracker.process_frame(frame_rgb)
+                frame_bgr = self.capture_lores_bgr()
+
+                # Run AI detection and tracking; returns None until the
+                # pipeline has a new result
+                detections = None
+                if frame_bgr is not None:
+                    detections = self.tracker.process_frame(frame_bgr)
+
+                if detections is not None:
+                    # The result's stats are the tracker's live dict; keep a
+                    # snapshot so each record holds its own frame's counters
+                    detections = {
+                        **detections,
+                        "stats": self.tracker.snapshot_stats(),
+                    }
 
                     # Store tracking data with timestamp
                     timestamp = time.time()
@@ -257,20 +307,28 @@ class CameraServer:
         existing_data = []
         if os.path.exists(tracking_file):
             try:
-                with open(tracking_file, "r") as f:
-                    existing_data = json.load(f)
+                if orjson is not None:
+                    with open(tracking_file, "rb") as f:
+                        existing_data = orjson.loads(f.read())
+                else:
+                    with open(tracking_file, "r") as f:
+                        existing_data = json.load(f)
             except:
                 existing_data = []
 
         existing_data.extend(data)
 
-        with open(tracking_file, "w") as f:
-            json.dump(existing_data, f)
+        if orjson is not None:
+            with open(tracking_file, "wb") as f:
+                f.write(orjson.dumps(existing_data, option=orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(tracking_file, "w") as f:
+                json.dump(existing_data, f)
 
     def notify_recording_complete(self, session_id, recording_path):
         """Notify main server that recording is complete"""
         try:
-            requests.post(
+            self.http.post(
                 f"{self.main_server_url}/api/camera/recording_complete",
                 json={
                     "session_id": session_id,
@@ -395,6 +453,9 @@ def signal_handler(sig, frame):
         print("Stopping recording...")
         camera_server.stop_recording()
 
+    if camera_server.tracker:
+        camera_server.tracker.close()
+
     if camera_server.picam2:
         try:
             camera_server.picam2.stop()
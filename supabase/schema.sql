@@ -114,10 +114,19 @@ CREATE TABLE public.likes (
 CREATE INDEX idx_turf_locations_owner ON public.turf_locations(owner_id);
 CREATE INDEX idx_game_sessions_turf ON public.game_sessions(turf_id);
 CREATE INDEX idx_game_sessions_created_by ON public.game_sessions(created_by);
+CREATE INDEX idx_game_sessions_status ON public.game_sessions(status);
+CREATE INDEX idx_player_sessions_session ON public.player_sessions(session_id);
 CREATE INDEX idx_highlights_session ON public.highlights(session_id);
 CREATE INDEX idx_highlights_created_by ON public.highlights(created_by);
 CREATE INDEX idx_social_posts_user ON public.social_posts(user_id);
 CREATE INDEX idx_social_posts_highlight ON public.social_posts(highlight_id);
+CREATE INDEX idx_comments_post ON public.comments(post_id);
+CREATE INDEX idx_likes_highlight ON public.likes(highlight_id);
+CREATE INDEX idx_likes_post ON public.likes(post_id);
+
+-- Feed ordering indexes for keyset pagination on (created_at, id)
+CREATE INDEX idx_highlights_feed ON public.highlights(created_at DESC, id DESC);
+CREATE INDEX idx_social_posts_feed ON public.social_posts(created_at DESC, id DESC);
 
 -- Row Level Security (RLS) policies
 ALTER TABLE public.profiles ENABLE ROW LEVEL SECURITY;
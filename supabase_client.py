@@ -156,6 +156,40 @@ class SupabaseClient:
             logger.error(f"Failed to upload video: {e}")
             return None
 
+    def save_highlights(self, session_id: str, highlights: List[Dict]) -> bool:
+        """Insert all highlights for a session in one multi-row request"""
+        if not highlights:
+            return True
+
+        try:
+            rows = [
+                {
+                    "session_id": session_id,
+                    "title": highlight["title"],
+                    "description": highlight.get("description"),
+                    "video_path": highlight["video_path"],
+                    "thumbnail_path": highlight.get("thumbnail_path"),
+                    "start_timestamp": highlight.get("start_timestamp"),
+                    "end_timestamp": highlight.get("end_timestamp"),
+                    "duration": highlight.get("duration"),
+                    "tags": highlight.get("tags", []),
+                    "metadata": {
+                        "type": highlight.get("type"),
+                        "score": highlight.get("score"),
+                        "camera_id": self.camera_id,
+                    },
+                }
+                for highlight in highlights
+            ]
+
+            self.supabase.table("highlights").insert(rows).execute()
+
+            logger.info(f"Saved {len(rows)} highlights for session {session_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save highlights: {e}")
+            return False
+
     def heartbeat(self) -> bool:
         """Send heartbeat to keep camera status updated"""
         try:
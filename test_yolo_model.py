@@ -1,95 +1,12 @@
 import cv2
 from ultralytics import YOLO
+from config import CLASS_NAMES, color_of
 
 # Load YOLO model
 print("Loading YOLO model...")
 model = YOLO("yolo11n.pt")
 print("✅ YOLO model loaded successfully")
 
-# COCO class names (80 classes)
-class_names = [
-    "person",
-    "bicycle",
-    "car",
-    "motorcycle",
-    "airplane",
-    "bus",
-    "train",
-    "truck",
-    "boat",
-    "traffic light",
-    "fire hydrant",
-    "stop sign",
-    "parking meter",
-    "bench",
-    "bird",
-    "cat",
-    "dog",
-    "horse",
-    "sheep",
-    "cow",
-    "elephant",
-    "bear",
-    "zebra",
-    "giraffe",
-    "backpack",
-    "umbrella",
-    "handbag",
-    "tie",
-    "suitcase",
-    "frisbee",
-    "skis",
-    "snowboard",
-    "sports ball",
-    "kite",
-    "baseball bat",
-    "baseball glove",
-    "skateboard",
-    "surfboard",
-    "tennis racket",
-    "bottle",
-    "wine glass",
-    "cup",
-    "fork",
-    "knife",
-    "spoon",
-    "bowl",
-    "banana",
-    "apple",
-    "sandwich",
-    "orange",
-    "broccoli",
-    "carrot",
-    "hot dog",
-    "pizza",
-    "donut",
-    "cake",
-    "chair",
-    "couch",
-    "potted plant",
-    "bed",
-    "dining table",
-    "toilet",
-    "tv",
-    "laptop",
-    "mouse",
-    "remote",
-    "keyboard",
-    "cell phone",
-    "microwave",
-    "oven",
-    "toaster",
-    "sink",
-    "refrigerator",
-    "book",
-    "clock",
-    "vase",
-    "scissors",
-    "teddy bear",
-    "hair drier",
-    "toothbrush",
-]
-
 # Initialize camera
 cap = cv2.VideoCapture(0)
 if not cap.isOpened():
@@ -99,20 +16,6 @@ if not cap.isOpened():
 print("✅ Camera opened successfully")
 print("Press 'q' to quit")
 
-# Colors for different objects
-colors = [
-    (255, 0, 0),
-    (0, 255, 0),
-    (0, 0, 255),
-    (255, 255, 0),
-    (255, 0, 255),
-    (0, 255, 255),
-    (128, 0, 128),
-    (255, 165, 0),
-    (0, 128, 128),
-    (128, 128, 0),
-]
-
 while True:
     ret, frame = cap.read()
     if not ret:
@@ -125,21 +28,24 @@ while True:
     for result in results:
         boxes = result.boxes
         if boxes is not None:
-            for i, box in enumerate(boxes):
-                # Get box coordinates
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                conf = box.conf[0].cpu().numpy()
-                cls = int(box.cls[0].cpu().numpy())
+            # One device-to-host copy per tensor instead of three per box
+            xyxy = boxes.xyxy.cpu().numpy()
+            confs = boxes.conf.cpu().numpy()
+            classes = boxes.cls.cpu().numpy().astype(int)
+
+            for (x1, y1, x2, y2), conf, cls in zip(
+                xyxy.tolist(), confs.tolist(), classes.tolist()
+            ):
 
                 # Only show high confidence detections
                 if conf > 0.5:
                     # Get object name
                     object_name = (
-                        class_names[cls] if cls < len(class_names) else f"Class {cls}"
+                        CLASS_NAMES[cls] if cls < len(CLASS_NAMES) else f"Class {cls}"
                     )
 
-                    # Choose color based on object type
-                    color = colors[cls % len(colors)]
+                    # Color by object category
+                    color = color_of(cls)
 
                     # Draw bounding box
                     cv2.rectangle(
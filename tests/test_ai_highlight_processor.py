@@ -0,0 +1,177 @@
+"""Tests for highlight detection and clip creation in ai_highlight_processor.py"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+
+import ai_highlight_processor
+from ai_highlight_processor import ActionClassifier, FootballHighlightProcessor
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """Processor with the YOLO models replaced by a class-name table"""
+    monkeypatch.setattr(
+        FootballHighlightProcessor,
+        "load_model",
+        lambda self, *args, **kwargs: SimpleNamespace(
+            names={0: "person", 32: "sports ball"}
+        ),
+    )
+    monkeypatch.setattr(
+        ai_highlight_processor.torch.cuda, "is_available", lambda: False
+    )
+    return FootballHighlightProcessor()
+
+
+def make_analysis(timestamps, activity_scores, events=None, fps=30.0):
+    """Analysis data in the shape analyze_video returns"""
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    return {
+        "fps": fps,
+        "duration": float(timestamps[-1]) + 1.0,
+        "timestamps": timestamps,
+        "activity_scores": np.asarray(activity_scores, dtype=np.float32),
+        "events": events or [[] for _ in timestamps],
+    }
+
+
+def make_moment(start_time, end_time, highlight_type, score):
+    """Highlight moment in the shape detect_highlights returns"""
+    return {
+        "start_time": start_time,
+        "end_time": end_time,
+        "peak_timestamp": (start_time + end_time) / 2,
+        "score": score,
+        "type": highlight_type,
+        "events": [],
+        "duration": end_time - start_time,
+    }
+
+
+def test_peak_distance_is_measured_in_seconds(processor):
+    # Motion gating left one sample per second: 60 samples for a minute
+    timestamps = np.arange(60.0)
+    scores = np.full(60, 0.1)
+    scores[[10, 13, 40]] = [0.9, 0.8, 0.95]
+
+    highlights = processor.detect_highlights(make_analysis(timestamps, scores))
+
+    # 10 s and 40 s are far apart in time; 13 s is within 5 s of 10 s
+    peak_times = sorted(h["peak_timestamp"] for h in highlights)
+    assert peak_times == [10.0, 40.0]
+
+
+def test_peak_events_come_from_two_seconds_around_the_peak(processor):
+    # Dense samples around the peak, then a long gated-out stretch
+    timestamps = [9.6, 9.8, 10.0, 10.2, 10.4, 13.0, 20.0]
+    scores = [0.2, 0.3, 0.9, 0.3, 0.2, 0.1, 0.1]
+    events = [[] for _ in timestamps]
+    events[1] = [{"type": "ball_near_goal", "confidence": 0.7}]
+    events[5] = [{"type": "celebration", "confidence": 0.6}]
+
+    highlights = processor.detect_highlights(make_analysis(timestamps, scores, events))
+
+    # The celebration sample is 3 s after the peak even though it is only
+    # three samples away, so the peak is an attempt and not a goal
+    assert len(highlights) == 1
+    assert highlights[0]["type"] == "goal_attempt"
+    assert [e["type"] for e in highlights[0]["events"]] == ["ball_near_goal"]
+
+
+def test_failed_clip_does_not_drop_the_others(processor, monkeypatch, tmp_path):
+    moments = [
+        make_moment(0.0, 10.0, "goal", 0.9),
+        make_moment(50.0, 60.0, "general", 0.8),
+    ]
+    calls = []
+
+    def fake_run(cmd, check, capture_output):
+        calls.append(cmd)
+        outputs = [arg for arg in cmd if arg.startswith(str(tmp_path))]
+        if cmd.count("-i") > 1 or "general" in outputs[0]:
+            # Leave a partial clip behind, like an interrupted ffmpeg
+            with open(outputs[0], "wb") as f:
+                f.write(b"partial")
+            raise ai_highlight_processor.subprocess.CalledProcessError(1, cmd)
+        for path in outputs:
+            with open(path, "wb") as f:
+                f.write(b"data")
+
+    monkeypatch.setattr(ai_highlight_processor.subprocess, "run", fake_run)
+
+    highlights = processor.create_highlight_clips("match.mp4", moments, str(tmp_path))
+
+    # One combined call, then one call per clip
+    assert len(calls) == 3
+    assert [h["type"] for h in highlights] == ["goal"]
+    assert not list(tmp_path.glob("highlight_1_general_*.mp4"))
+
+
+def jumping_pose(x, y):
+    """Pose entry for a jumping player whose box is centred on (x, y)"""
+    return {
+        "bbox": [x - 20, y - 40, x + 20, y + 40],
+        "features": {"action_type": "jumping"},
+    }
+
+
+def test_celebration_needs_jumping_players_grouped_together(processor):
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+    grouped = [jumping_pose(600, 300), jumping_pose(660, 320), jumping_pose(90, 600)]
+    events = processor.detect_frame_events([], grouped, frame)
+    celebrations = [e for e in events if e["type"] == "celebration"]
+    assert len(celebrations) == 1
+    assert celebrations[0]["player_count"] == 2
+
+    spread = [jumping_pose(100, 300), jumping_pose(1100, 600)]
+    events = processor.detect_frame_events([], spread, frame)
+    assert not [e for e in events if e["type"] == "celebration"]
+
+
+def player_pose(x, y, landmarks):
+    """Pose entry for a 40x80 player box with its top-left corner at (x, y)"""
+    return {"bbox": [x, y, x + 40, y + 80], "landmarks": landmarks}
+
+
+def test_classify_sequence_measures_player_displacement():
+    classifier = ActionClassifier()
+    still_limbs = np.full((17, 2), 0.5).tolist()
+
+    # Same pose inside the box, box moving one body height per sample
+    moving = [player_pose(100 + 80 * i, 300, still_limbs) for i in range(4)]
+    assert classifier.classify_sequence(moving) == "running"
+
+    # Box stays put while arms and legs swing in opposite directions
+    swing = np.tile([[0.3], [-0.3]], (9, 2))[:17]
+    swinging = [
+        player_pose(100, 300, (0.5 + swing * (-1) ** i).tolist()) for i in range(4)
+    ]
+    assert classifier.classify_sequence(swinging) == "standing"
+
+
+def test_process_video_saves_session_highlights_in_one_call(
+    processor, monkeypatch, tmp_path
+):
+    highlights = [{"title": "Goal!"}, {"title": "Big Chance"}]
+    monkeypatch.setattr(processor, "analyze_video", lambda video_path: {})
+    monkeypatch.setattr(processor, "detect_highlights", lambda analysis_data: [])
+    monkeypatch.setattr(
+        processor, "create_highlight_clips", lambda *args, **kwargs: highlights
+    )
+
+    saved = []
+    client = SimpleNamespace(
+        save_highlights=lambda session_id, rows: saved.append((session_id, rows))
+    )
+    monkeypatch.setattr(ai_highlight_processor, "get_supabase_client", lambda: client)
+
+    processor.process_video("match.mp4", str(tmp_path), session_id="session-1")
+
+    assert saved == [("session-1", highlights)]
@@ -0,0 +1,311 @@
+"""
+Tests for FootballTracker, run end-to-end through process_frame with a
+scripted detector in place of the YOLO model
+"""
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+
+import enhanced_football_tracker
+from enhanced_football_tracker import FootballTracker
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+PERSON = 0
+SPORTS_BALL = 32
+
+
+class FakeDetector:
+    """Returns one script entry per call, repeating the last
+
+    Entries are detection lists for detect, or lists of per-frame detection
+    lists for detect_batch.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.calls = 0
+
+    def detect(self, frame):
+        item = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def detect_batch(self, frames):
+        batch = self.detect(frames[0])
+        assert len(batch) == len(frames)
+        return batch
+
+
+@pytest.fixture
+def make_tracker(monkeypatch):
+    """Build a FootballTracker whose detector replays a script"""
+    trackers = []
+
+    def make(script, **kwargs):
+        detector = FakeDetector(script)
+        monkeypatch.setattr(
+            enhanced_football_tracker,
+            "FootballDetector",
+            lambda **detector_kwargs: detector,
+        )
+        tracker = FootballTracker(**kwargs)
+        trackers.append(tracker)
+        return tracker
+
+    yield make
+    for tracker in trackers:
+        tracker.close()
+
+
+def wait_for_result(tracker, timeout=2.0):
+    """Feed frames to a pipelined tracker until it returns a result"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = tracker.process_frame(FRAME)
+        if result is not None:
+            return result
+        time.sleep(0.01)
+    raise AssertionError("pipelined tracker produced no result")
+
+
+def test_process_frame_returns_tracked_object_dicts(make_tracker):
+    tracker = make_tracker(
+        [[(100, 200, 20, 40, 0.9, PERSON), (300, 220, 8, 8, 0.8, SPORTS_BALL)]]
+    )
+
+    result = tracker.process_frame(FRAME)
+
+    objects = sorted(result["tracked_objects"], key=lambda obj: obj["track_id"])
+    assert objects == [
+        {
+            "track_id": 0,
+            "bbox": (100, 200, 20, 40),
+            "class_name": "person",
+            "confidence": 0.9,
+        },
+        {
+            "track_id": 1,
+            "bbox": (300, 220, 8, 8),
+            "class_name": "sports ball",
+            "confidence": 0.8,
+        },
+    ]
+    assert result["stats"]["total_detections"] == 2
+    assert result["stats"]["player_count"] == 1
+    assert result["stats"]["ball_detections"] == 1
+
+
+def test_track_ids_follow_moving_detections(make_tracker):
+    tracker = make_tracker(
+        [
+            [(100, 200, 20, 40, 0.9, PERSON)],
+            [(110, 205, 20, 40, 0.9, PERSON)],
+        ]
+    )
+
+    tracker.process_frame(FRAME)
+    (player,) = tracker.process_frame(FRAME)["tracked_objects"]
+
+    assert player["track_id"] == 0
+    assert player["bbox"] == (110, 205, 20, 40)
+
+
+def test_pipelined_process_frame_returns_tracked_objects(make_tracker):
+    tracker = make_tracker([[(100, 200, 20, 40, 0.9, PERSON)]], pipelined=True)
+
+    result = wait_for_result(tracker)
+
+    (player,) = result["tracked_objects"]
+    assert player["class_name"] == "person"
+
+
+def test_pipelined_worker_error_reaches_caller(make_tracker):
+    tracker = make_tracker(
+        [RuntimeError("detector failed"), [(100, 200, 20, 40, 0.9, PERSON)]],
+        pipelined=True,
+    )
+
+    with pytest.raises(RuntimeError, match="detector failed"):
+        wait_for_result(tracker)
+
+    # The workers survive the error and keep processing later frames
+    assert wait_for_result(tracker)["tracked_objects"]
+
+
+def test_pipelined_tracker_restarts_after_close(make_tracker):
+    tracker = make_tracker([[(100, 200, 20, 40, 0.9, PERSON)]], pipelined=True)
+    wait_for_result(tracker)
+
+    tracker.close()
+    assert not tracker.workers
+
+    tracker.start()
+    assert wait_for_result(tracker)["tracked_objects"]
+
+
+def test_stats_count_players_and_balls_from_tracker_output(make_tracker):
+    tracker = make_tracker(
+        [
+            [
+                (100, 200, 20, 40, 0.9, PERSON),
+                (200, 240, 20, 40, 0.6, PERSON),
+                (300, 220, 8, 8, 0.8, SPORTS_BALL),
+                (500, 100, 60, 30, 0.7, 2),  # car
+            ]
+        ]
+    )
+
+    stats = tracker.process_frame(FRAME)["stats"]
+
+    assert stats["player_count"] == 2
+    assert stats["ball_detections"] == 1
+
+
+def test_process_frame_reports_fast_movement_for_every_track(make_tracker):
+    # MultiObjectTracker numbers tracks from 0, so the first player is 0
+    tracker = make_tracker(
+        [
+            [(100, 200, 20, 40, 0.9, PERSON)],
+            [(130, 200, 20, 40, 0.9, PERSON)],
+        ]
+    )
+
+    tracker.process_frame(FRAME)
+    events = tracker.process_frame(FRAME)["events"]
+
+    assert [(event["type"], event["player_id"]) for event in events] == [
+        ("fast_movement", 0)
+    ]
+
+
+def test_process_frame_reports_goal_and_possession_change(make_tracker):
+    player_a = (100, 300, 20, 40, 0.9, PERSON)
+    player_b = (140, 300, 20, 40, 0.9, PERSON)
+    tracker = make_tracker(
+        [
+            # Ball at player 0's feet
+            [player_a, player_b, (116, 356, 8, 8, 0.8, SPORTS_BALL)],
+            # Ball passed to player 1
+            [player_a, player_b, (136, 356, 8, 8, 0.8, SPORTS_BALL)],
+            # Ball carried into the left goal area
+            [player_a, player_b, (96, 356, 8, 8, 0.8, SPORTS_BALL)],
+        ]
+    )
+
+    assert tracker.process_frame(FRAME)["events"] == []
+
+    (possession,) = tracker.process_frame(FRAME)["events"]
+    assert possession["type"] == "possession_change"
+    assert (possession["from_player"], possession["to_player"]) == (0, 1)
+
+    # Possession swings back too, but is still in its cooldown
+    events = tracker.process_frame(FRAME)["events"]
+    assert [event["type"] for event in events] == ["goal"]
+    assert events[0]["location"] == "left_goal"
+
+
+def test_process_frame_handles_more_players_than_buffer_capacity(make_tracker):
+    capacity = enhanced_football_tracker.MAX_PLAYERS
+    players = [
+        (20 + 60 * (i % 10), 20 + 60 * (i // 10), 10, 10, 0.9, PERSON)
+        for i in range(capacity + 6)
+    ]
+    # Only the last player, past the initial buffer capacity, moves
+    moved = players[:-1] + [(players[-1][0] + 20,) + players[-1][1:]]
+    tracker = make_tracker([players, moved])
+
+    tracker.process_frame(FRAME)
+    result = tracker.process_frame(FRAME)
+
+    assert result["stats"]["player_count"] == capacity + 6
+    assert [(event["type"], event["player_id"]) for event in result["events"]] == [
+        ("fast_movement", capacity + 5)
+    ]
+
+
+def test_skipped_frames_repeat_result_without_recounting(make_tracker):
+    tracker = make_tracker([[(100, 200, 20, 40, 0.9, PERSON)]], detect_interval=3)
+    updates = []
+    update = tracker.tracker.update
+    tracker.tracker.update = lambda rects: updates.append(rects) or update(rects)
+
+    first = tracker.process_frame(FRAME)
+    skipped = tracker.process_frame(FRAME)
+
+    assert tracker.detector.calls == 1
+    assert skipped["frame_number"] == 2
+    assert skipped["tracked_objects"] == first["tracked_objects"]
+    assert skipped["events"] == []
+    assert skipped["stats"]["total_frames"] == 2
+    assert skipped["stats"]["total_detections"] == 1
+    # The tracker was not fed the reused detections again
+    assert len(updates) == 1
+
+    tracker.process_frame(FRAME)
+    assert tracker.detector.calls == 2
+    assert tracker.stats["total_detections"] == 2
+
+
+def test_process_frames_keeps_stats_per_camera(make_tracker):
+    tracker = make_tracker(
+        [
+            [
+                [(100, 200, 20, 40, 0.9, PERSON), (200, 240, 20, 40, 0.6, PERSON)],
+                [(300, 200, 20, 40, 0.9, PERSON), (300, 260, 8, 8, 0.8, SPORTS_BALL)],
+            ]
+        ]
+    )
+
+    first, second = tracker.process_frames([FRAME, FRAME])
+
+    assert first["stats"]["player_count"] == 2
+    assert first["stats"]["ball_detections"] == 0
+    assert second["stats"]["player_count"] == 1
+    assert second["stats"]["ball_detections"] == 1
+    assert tracker.stats["total_detections"] == 0
+
+
+def test_reset_clears_per_camera_state(make_tracker):
+    tracker = make_tracker([[[(100, 200, 20, 40, 0.9, PERSON)]]])
+    tracker.process_frames([FRAME])
+
+    tracker.reset()
+
+    assert tracker.camera_state == {}
+    assert tracker.frame_count == 0
+    (result,) = tracker.process_frames([FRAME])
+    assert result["stats"]["total_detections"] == 1
+
+
+def test_snapshot_stats_keep_each_frames_counters(make_tracker):
+    tracker = make_tracker([[(100, 200, 20, 40, 0.9, PERSON)]])
+
+    snapshots = []
+    for _ in range(3):
+        tracker.process_frame(FRAME)
+        snapshots.append(tracker.snapshot_stats())
+
+    # Later frames must not change a snapshot already taken
+    assert [s["total_frames"] for s in snapshots] == [1, 2, 3]
+    assert [s["total_detections"] for s in snapshots] == [1, 2, 3]
+
+
+def test_snapshot_stats_serialize_as_plain_json(make_tracker):
+    tracker = make_tracker([[(100, 200, 20, 40, 0.9, PERSON)]])
+    tracker.process_frame(FRAME)
+    tracker.update_stats([], [], [], [{"type": "goal", "goal_area": "left_goal"}])
+
+    # The live events deque is converted, so no default= hook is needed
+    stats = json.loads(json.dumps(tracker.snapshot_stats()))
+
+    assert stats["events"] == [{"type": "goal", "goal_area": "left_goal"}]
+    assert stats["total_frames"] == 1
@@ -0,0 +1,59 @@
+"""
+Tests for FootballEventDetector fed with real MultiObjectTracker output
+"""
+
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+
+from enhanced_football_tracker import (
+    FootballEventDetector,
+    build_tracked_objects,
+    split_players_and_balls,
+)
+from tracking import MultiObjectTracker
+
+PERSON = 0
+SPORTS_BALL = 32
+
+
+def track(tracker, detections):
+    """Run one tracker update and build its tracked-object dicts"""
+    tracker.update([detection[:4] for detection in detections])
+    return build_tracked_objects(tracker, detections)
+
+
+def test_detect_events_reads_tracker_output():
+    tracker = MultiObjectTracker()
+    detector = FootballEventDetector()
+
+    # Ball inside the left goal area, next to a player
+    tracked_objects = track(
+        tracker,
+        [(40, 280, 20, 40, 0.9, PERSON), (50, 300, 8, 8, 0.8, SPORTS_BALL)],
+    )
+    events = detector.detect_events(tracked_objects, frame=None)
+
+    assert [event["type"] for event in events] == ["goal"]
+    assert events[0]["location"] == "left_goal"
+    # The first player near the ball takes possession without an event
+    assert detector.current_possession == 0
+
+
+def test_split_players_and_balls_on_tracker_output():
+    tracker = MultiObjectTracker()
+    tracked_objects = track(
+        tracker,
+        [
+            (100, 200, 20, 40, 0.9, PERSON),
+            (300, 220, 8, 8, 0.8, SPORTS_BALL),
+            (500, 100, 60, 30, 0.7, 2),  # car
+            (200, 240, 20, 40, 0.6, PERSON),
+        ],
+    )
+
+    players, balls = split_players_and_balls(tracked_objects)
+
+    assert sorted(player["track_id"] for player in players) == [0, 3]
+    assert [ball["track_id"] for ball in balls] == [1]
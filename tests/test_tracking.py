@@ -0,0 +1,25 @@
+"""Tests for the centroid tracker in tracking.py"""
+
+import pytest
+
+pytest.importorskip("cv2")
+
+from tracking import MultiObjectTracker
+
+
+def test_update_rejects_rects_that_are_not_xywh():
+    tracker = MultiObjectTracker()
+
+    # Detection tuples carry conf and class id after the box
+    with pytest.raises(ValueError):
+        tracker.update([(100, 200, 20, 40, 0.9, 0), (300, 220, 8, 8, 0.8, 32)])
+
+
+def test_update_matches_moving_boxes_to_existing_ids():
+    tracker = MultiObjectTracker()
+    tracker.update([(100, 200, 20, 40), (300, 220, 8, 8)])
+
+    objects = tracker.update([(305, 222, 8, 8), (104, 203, 20, 40)])
+
+    assert {i: tuple(c) for i, c in objects.items()} == {0: (114, 223), 1: (309, 226)}
+    assert tracker.matched_rects == {0: 1, 1: 0}
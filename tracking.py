@@ -7,6 +7,50 @@ import cv2
 import numpy as np
 from collections import defaultdict
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _match_centroids(object_centroids, input_centroids, max_distance, matches):
+    """Greedy nearest-centroid matching: matches[row] = input col, or -1
+
+    Objects are visited from the closest to the farthest nearest input, and
+    each takes its nearest input unless another object already has it.
+    """
+    num_objects = object_centroids.shape[0]
+    num_inputs = input_centroids.shape[0]
+
+    # Nearest input for every existing object
+    nearest = np.empty(num_objects, dtype=np.int64)
+    nearest_distance = np.empty(num_objects, dtype=np.float64)
+    for row in range(num_objects):
+        best = 0
+        best_distance = np.inf
+        for col in range(num_inputs):
+            dx = object_centroids[row, 0] - input_centroids[col, 0]
+            dy = object_centroids[row, 1] - input_centroids[col, 1]
+            distance = np.sqrt(dx * dx + dy * dy)
+            if distance < best_distance:
+                best = col
+                best_distance = distance
+        nearest[row] = best
+        nearest_distance[row] = best_distance
+
+    used = np.zeros(num_inputs, dtype=np.bool_)
+    for row in np.argsort(nearest_distance, kind="mergesort"):
+        matches[row] = -1
+        col = nearest[row]
+        if used[col] or nearest_distance[row] > max_distance:
+            continue
+        matches[row] = col
+        used[col] = True
+
+
+if numba is not None:
+    _match_centroids = numba.njit(cache=True)(_match_centroids)
+
 
 class MultiObjectTracker:
     def __init__(self, max_disappeared=30, max_distance=50):
@@ -16,11 +60,17 @@ class MultiObjectTracker:
         self.max_disappeared = max_disappeared
         self.max_distance = max_distance
 
+        # object id -> index into the rects of the latest update, for every
+        # object matched to (or registered from) a rect in that update
+        self.matched_rects = {}
+
     def register(self, centroid):
-        """Register a new object"""
-        self.objects[self.next_object_id] = centroid
-        self.disappeared[self.next_object_id] = 0
+        """Register a new object and return its id"""
+        object_id = self.next_object_id
+        self.objects[object_id] = centroid
+        self.disappeared[object_id] = 0
         self.next_object_id += 1
+        return object_id
 
     def deregister(self, object_id):
         """Deregister an object"""
@@ -29,6 +79,7 @@ class MultiObjectTracker:
 
     def update(self, rects):
         """Update object tracking"""
+        self.matched_rects = {}
         if len(rects) == 0:
             # Mark all objects as disappeared
             for object_id in list(self.disappeared.keys()):
@@ -38,57 +89,48 @@ class MultiObjectTracker:
             return self.objects
 
         # Compute centroids
-        input_centroids = np.zeros((len(rects), 2), dtype="int")
-        for i, (x, y, w, h) in enumerate(rects):
-            cx = int(x + w / 2.0)
-            cy = int(y + h / 2.0)
-            input_centroids[i] = (cx, cy)
+        boxes = np.asarray(rects, dtype=np.float64)
+        if boxes.ndim != 2 or boxes.shape[1] != 4:
+            raise ValueError(
+                f"rects must be (x, y, w, h) boxes, got shape {boxes.shape}"
+            )
+        input_centroids = (boxes[:, :2] + boxes[:, 2:] / 2.0).astype("int")
 
         # If no existing objects, register all
         if len(self.objects) == 0:
             for i in range(len(input_centroids)):
-                self.register(input_centroids[i])
+                self.matched_rects[self.register(input_centroids[i])] = i
         else:
             # Match existing objects to new centroids
-            object_centroids = list(self.objects.values())
-            D = np.linalg.norm(
-                np.array(object_centroids)[:, np.newaxis] - input_centroids, axis=2
+            object_ids = list(self.objects.keys())
+            matches = np.empty(len(object_ids), dtype=np.int64)
+            _match_centroids(
+                np.array(list(self.objects.values()), dtype=np.float64),
+                input_centroids.astype(np.float64),
+                float(self.max_distance),
+                matches,
             )
-            rows = D.min(axis=1).argsort()
-            cols = D.argmin(axis=1)[rows]
-
-            used_row_indices = set()
-            used_col_indices = set()
-
-            for row, col in zip(rows, cols):
-                if row in used_row_indices or col in used_col_indices:
-                    continue
-
-                if D[row, col] > self.max_distance:
-                    continue
-
-                object_id = list(self.objects.keys())[row]
-                self.objects[object_id] = input_centroids[col]
-                self.disappeared[object_id] = 0
-
-                used_row_indices.add(row)
-                used_col_indices.add(col)
 
-            # Handle unmatched objects
-            unused_row_indices = set(range(0, D.shape[0])).difference(used_row_indices)
-            unused_col_indices = set(range(0, D.shape[1])).difference(used_col_indices)
+            for object_id, col in zip(object_ids, matches.tolist()):
+                if col >= 0:
+                    self.objects[object_id] = input_centroids[col]
+                    self.disappeared[object_id] = 0
+                    self.matched_rects[object_id] = col
 
             # If more objects than detections, mark as disappeared
-            if D.shape[0] >= D.shape[1]:
-                for row in unused_row_indices:
-                    object_id = list(self.objects.keys())[row]
+            if len(object_ids) >= len(input_centroids):
+                for object_id, col in zip(object_ids, matches.tolist()):
+                    if col >= 0:
+                        continue
                     self.disappeared[object_id] += 1
 
                     if self.disappeared[object_id] > self.max_disappeared:
                         self.deregister(object_id)
             else:
                 # Register new objects
-                for col in unused_col_indices:
-                    self.register(input_centroids[col])
+                matched = np.zeros(len(input_centroids), dtype=bool)
+                matched[matches[matches >= 0]] = True
+                for col in np.flatnonzero(~matched).tolist():
+                    self.matched_rects[self.register(input_centroids[col])] = col
 
         return self.objects